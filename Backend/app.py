@@ -9,6 +9,14 @@ from datetime import timedelta
 from flask_socketio import SocketIO
 from flask import request, make_response, send_from_directory
 
+# .env first: the logger setup below reads FLASK_ENV / LOG_LEVEL at import time
+load_dotenv()
+
+# Root logger setup (LOG_LEVEL env, DEBUG in dev / INFO in prod) — must run
+# before the route modules are imported so their module loggers inherit it.
+import utils.logging  # noqa: F401
+from utils.json_provider import OrjsonProvider, ORJSON_AVAILABLE
+
 # Import all route functions
 from routes.auth import (
     signup, login, logout, update_first_login, get_me,
@@ -51,10 +59,12 @@ from routes.search import search_bp
 from routes.pins import pins_bp
 from routes.status import status_bp
 
-load_dotenv()
-
 app = Flask(__name__)
 
+# orjson for jsonify()/get_json() when installed (same wire format as default)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
+
 # Gzip compression for all responses > 500 bytes
 Compress(app)
 
@@ -354,6 +364,7 @@ from database import get_db_connection
 def monitor_inactive_users():
     """Background task to mark users as offline if they haven't sent heartbeat in 2 minutes"""
     from routes.sockets import user_heartbeats
+    from services.user_cache import invalidate_profile
     
     while True:
         try:
@@ -381,6 +392,7 @@ def monitor_inactive_users():
                             
                             # Remove from heartbeat tracking
                             del user_heartbeats[username]
+                            invalidate_profile(username)
                             
                             # Emit status update
                             socketio.emit('user_status', {
@@ -406,11 +418,15 @@ print("[MONITOR] Started inactive user monitoring thread")
 def session_cleanup_job():
     """Periodically clean up expired refresh tokens and blocklist entries."""
     from services.session_manager import cleanup_expired_tokens, cleanup_blocklist_cache
+    from services.user_cache import cleanup_cache as cleanup_user_cache
+    from services.community_cache import cleanup_cache as cleanup_community_cache
     while True:
         try:
             time.sleep(3600)  # Run every hour
             cleanup_expired_tokens()
             cleanup_blocklist_cache()
+            cleanup_user_cache()
+            cleanup_community_cache()
         except Exception as e:
             print(f"[SESSION] Cleanup error: {e}")
 
@@ -32,6 +32,17 @@ JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", os.urandom(32).hex() if not IS_PROD
 if IS_PRODUCTION and not JWT_SECRET_KEY:
     raise RuntimeError("JWT_SECRET_KEY must be set in production environment")
 
+# Password hashing — bcrypt cost factor (each +1 doubles hash time).
+# 10 for constrained hosts, 12 default, 13-14 for high-security deployments.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Worker processes for bcrypt (0 = hash inline on the request worker,
+# -1 = one per CPU core)
+BCRYPT_POOL_WORKERS = int(os.getenv("BCRYPT_POOL_WORKERS", "0"))
+# Worker processes for community logo/banner resizing (same convention:
+# 0 = inline, -1 = one per CPU core). Opt-in: the default 0 keeps resizing on
+# the request worker; set it where uploads are frequent enough to matter.
+IMAGE_POOL_WORKERS = int(os.getenv("IMAGE_POOL_WORKERS", "0"))
+
 # Session management
 JWT_REFRESH_TOKEN_EXPIRES_DAYS = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRES_DAYS", "7"))
 
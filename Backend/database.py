@@ -8,15 +8,28 @@ from config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME
 DB_PORT = int(os.getenv('DB_PORT', '3306'))
 DB_SSL = os.getenv('DB_SSL', 'false').lower() == 'true'
 
+# ─── Pool sizing (tune per deployment) ──────────────────────────────
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '2'))    # idle connections opened at startup
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '20'))   # hard cap on simultaneous connections
+# When to ping a pooled connection (DBUtils flags): 1 = on every checkout
+# (one extra round-trip, survives server-side idle timeouts), 0 = never
+# (cheapest; only safe when the DB keeps idle connections open).
+DB_POOL_PING = int(os.getenv('DB_POOL_PING', '1'))
+# Reopen a pooled connection after this many checkouts (DBUtils has no
+# time-based recycle); bounds per-session server memory on long-lived
+# workers. 0 = reuse forever.
+DB_POOL_MAX_USAGE = int(os.getenv('DB_POOL_MAX_USAGE', '0'))
+
 # Build connection kwargs
 _pool_kwargs = dict(
     creator=pymysql,
-    maxconnections=20,       # max simultaneous connections
-    mincached=2,             # keep 2 idle connections ready
-    maxcached=10,            # cap idle pool size
+    maxconnections=DB_POOL_MAX,              # max simultaneous connections
+    mincached=DB_POOL_MIN,                   # idle connections kept ready
+    maxcached=max(DB_POOL_MIN, DB_POOL_MAX // 2),  # cap idle pool size
     blocking=True,           # block rather than error when pool exhausted
-    maxusage=0,              # unlimited reuse per connection
+    maxusage=DB_POOL_MAX_USAGE,  # recycle policy (see DB_POOL_MAX_USAGE)
     setsession=[],           # no per-session SQL
+    ping=DB_POOL_PING,       # liveness check policy (see DB_POOL_PING)
     host=DB_HOST,
     user=DB_USER,
     password=DB_PASSWORD,
@@ -35,5 +48,8 @@ _pool = PooledDB(**_pool_kwargs)
 
 
 def get_db_connection():
-    """Return a connection from the pool (drop-in replacement)."""
+    """
+    Return a connection from the pool (drop-in replacement).
+    conn.close() hands it back to the pool instead of closing the socket.
+    """
     return _pool.connection()
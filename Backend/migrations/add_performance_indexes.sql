@@ -22,3 +22,32 @@ CREATE INDEX IF NOT EXISTS idx_msg_channel_time ON messages(channel_id, created_
 
 -- blocked_users lookup by community_id + user_id
 CREATE INDEX IF NOT EXISTS idx_blocked_community_user ON blocked_users(community_id, user_id);
+
+-- community_members by user + role (EXISTS owner probe in login / get_me)
+CREATE INDEX IF NOT EXISTS idx_cm_user_role ON community_members(user_id, role);
+
+-- users.username / users.email: login's "username = %s OR email = %s" lookup is
+-- served by the UNIQUE keys; these plain duplicates only add write cost
+DROP INDEX IF EXISTS idx_user_email ON users;
+DROP INDEX IF EXISTS idx_username ON users;
+
+-- Covering composites for the hot membership probes. InnoDB has no INCLUDE
+-- clause, so the payload column is appended to the key instead; secondary
+-- indexes already carry the primary key.
+
+-- community_members: "community_id = %s AND user_id = %s" → role, index-only
+CREATE INDEX IF NOT EXISTS idx_cm_community_user_role ON community_members(community_id, user_id, role);
+
+-- channel_members: same probe for channel roles / join checks
+CREATE INDEX IF NOT EXISTS idx_chm_channel_user_role ON channel_members(channel_id, user_id, role);
+
+-- channels: get_community_channels filters on community_id and sorts by name
+CREATE INDEX IF NOT EXISTS idx_channels_community_name ON channels(community_id, name);
+DROP INDEX IF EXISTS idx_community_channels ON channels;
+
+-- friends: unique_friendship (user_id, friend_id) covers the user_id branch of
+-- get_friends; mirror it for the friend_id branch. The single-column indexes
+-- are prefixes of these and only add write cost.
+CREATE INDEX IF NOT EXISTS idx_friends_friend_user ON friends(friend_id, user_id);
+DROP INDEX IF EXISTS idx_friends_friend ON friends;
+DROP INDEX IF EXISTS idx_friends_user ON friends;
@@ -0,0 +1,11 @@
+-- =============================================
+-- Migration: Drop the unused users.token column
+-- Run once against the auraflow database
+-- =============================================
+
+-- users.token held a copy of the last issued JWT (up to 1500 bytes per row).
+-- Nothing reads it: JWTs are validated statelessly, revocation uses
+-- token_blocklist / refresh_tokens (add_session_management.sql), and no
+-- route writes it any more. Dropping it narrows every users row.
+
+ALTER TABLE users DROP COLUMN IF EXISTS token;
@@ -10,6 +10,7 @@ Security: All endpoints require JWT + admin/owner role verification.
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import get_db_connection
+from services.community_cache import invalidate_community
 from datetime import datetime, timedelta
 from functools import wraps
 import json
@@ -619,6 +620,8 @@ def resolve_moderation(log_id):
                 """, (log_entry['community_id'], log_entry['user_id']))
             
             conn.commit()
+            if log_entry['community_id']:
+                invalidate_community(log_entry['community_id'])
             
             return jsonify({
                 'success': True,
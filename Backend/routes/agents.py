@@ -8,6 +8,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import get_db_connection
 import json
+import logging
 
 # Import agents
 from agents.summarizer import SummarizerAgent
@@ -19,6 +20,8 @@ from agents.focus import FocusAgent
 from agents.engagement import EngagementAgent
 from agents.wellness import WellnessAgent
 
+log = logging.getLogger(__name__)
+
 # Create blueprint
 agents_bp = Blueprint('agents', __name__, url_prefix='/api/agents')
 
@@ -100,7 +103,7 @@ def summarize_channel(channel_id):
             }), 400
             
     except Exception as e:
-        print(f"[AGENTS API] Error in summarize_channel: {e}")
+        log.exception("[AGENTS API] Error in summarize_channel: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -118,7 +121,7 @@ def get_channel_summaries(channel_id):
     """
     try:
         username = get_jwt_identity()
-        print(f"[AGENTS API] Getting summaries for channel {channel_id} by user {username}")
+        log.debug("[AGENTS API] Getting summaries for channel %s by user %s", channel_id, username)
         
         # Get user ID and check access
         conn = get_db_connection()
@@ -145,7 +148,7 @@ def get_channel_summaries(channel_id):
         
         # Fetch summaries
         summaries = summarizer.get_recent_summaries(channel_id, limit)
-        print(f"[AGENTS API] Found {len(summaries)} summaries for channel {channel_id}")
+        log.debug("[AGENTS API] Found %s summaries for channel %s", len(summaries), channel_id)
         
         return jsonify({
             'success': True,
@@ -154,9 +157,7 @@ def get_channel_summaries(channel_id):
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_channel_summaries: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_channel_summaries: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -208,7 +209,7 @@ def get_summary(summary_id):
             }), 200
             
     except Exception as e:
-        print(f"[AGENTS API] Error in get_summary: {e}")
+        log.exception("[AGENTS API] Error in get_summary: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
     finally:
         if conn:
@@ -282,7 +283,7 @@ def track_mood(user_id):
             return jsonify(result), 400
             
     except Exception as e:
-        print(f"[AGENTS API] Error in track_mood: {e}")
+        log.exception("[AGENTS API] Error in track_mood: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -328,7 +329,7 @@ def get_mood_history(user_id):
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_mood_history: {e}")
+        log.exception("[AGENTS API] Error in get_mood_history: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -361,7 +362,7 @@ def analyze_message():
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in analyze_message: {e}")
+        log.exception("[AGENTS API] Error in analyze_message: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -400,7 +401,7 @@ def get_mood_trends(user_id):
         return jsonify(result), 200 if result.get('success') else 400
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_mood_trends: {e}")
+        log.exception("[AGENTS API] Error in get_mood_trends: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -440,9 +441,7 @@ def reanalyze_mood_history(user_id):
         return jsonify(result), 200 if result.get('success') else 400
         
     except Exception as e:
-        print(f"[AGENTS API] Error in reanalyze_mood_history: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in reanalyze_mood_history: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -477,7 +476,7 @@ def get_community_mood():
         return jsonify(result), 200 if result.get('success') else 400
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_community_mood: {e}")
+        log.exception("[AGENTS API] Error in get_community_mood: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -511,7 +510,7 @@ def get_mood_recommendations(user_id):
         return jsonify(result), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_mood_recommendations: {e}")
+        log.exception("[AGENTS API] Error in get_mood_recommendations: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -545,7 +544,7 @@ def get_mood_insights(user_id):
         return jsonify(result), 200 if result.get('success') else 400
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_mood_insights: {e}")
+        log.exception("[AGENTS API] Error in get_mood_insights: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -586,7 +585,7 @@ def check_moderation():
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in check_moderation: {e}")
+        log.exception("[AGENTS API] Error in check_moderation: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -682,9 +681,7 @@ def get_moderation_history():
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_moderation_history: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_moderation_history: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -783,9 +780,7 @@ def get_moderation_stats():
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_moderation_stats: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_moderation_stats: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -804,7 +799,7 @@ def analyze_engagement():
         time_period_hours = data.get('time_period_hours', 6)
         channel_id = data.get('channel_id')
         
-        print(f"[ENGAGEMENT] Analyzing engagement for user {username}, channel={channel_id}, hours={time_period_hours}")
+        log.debug("[ENGAGEMENT] Analyzing engagement for user %s, channel=%s, hours=%s", username, channel_id, time_period_hours)
         
         # Get user ID
         conn = get_db_connection()
@@ -869,14 +864,12 @@ def analyze_engagement():
             }
         }
         
-        print(f"[ENGAGEMENT] Analysis complete: {result.get('engagement_level', 'unknown')} ({result.get('engagement_score', 0)})")
+        log.debug("[ENGAGEMENT] Analysis complete: %s (%s)", result.get('engagement_level', 'unknown'), result.get('engagement_score', 0))
         
         return jsonify(response), 200
         
     except Exception as e:
-        print(f"[ENGAGEMENT] Error analyzing engagement: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[ENGAGEMENT] Error analyzing engagement: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -944,9 +937,7 @@ def get_engagement_metrics(channel_id):
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_engagement_metrics: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_engagement_metrics: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -986,7 +977,7 @@ def get_engagement_trends(channel_id):
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_engagement_trends: {e}")
+        log.exception("[AGENTS API] Error in get_engagement_trends: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1003,7 +994,7 @@ def get_icebreaker():
         result = engagement_agent.get_icebreaker_activity(activity_type)
         return jsonify(result), 200 if result.get('success') else 400
     except Exception as e:
-        print(f"[AGENTS API] Error in get_icebreaker: {e}")
+        log.exception("[AGENTS API] Error in get_icebreaker: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1015,7 +1006,7 @@ def get_icebreaker_categories():
         result = engagement_agent.get_all_icebreaker_categories()
         return jsonify(result), 200 if result.get('success') else 400
     except Exception as e:
-        print(f"[AGENTS API] Error in get_icebreaker_categories: {e}")
+        log.exception("[AGENTS API] Error in get_icebreaker_categories: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1028,7 +1019,7 @@ def get_quick_poll():
         result = engagement_agent.get_quick_poll(category)
         return jsonify(result), 200 if result.get('success') else 400
     except Exception as e:
-        print(f"[AGENTS API] Error in get_quick_poll: {e}")
+        log.exception("[AGENTS API] Error in get_quick_poll: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1041,7 +1032,7 @@ def get_fun_challenge():
         result = engagement_agent.get_fun_challenge(challenge_type)
         return jsonify(result), 200 if result.get('success') else 400
     except Exception as e:
-        print(f"[AGENTS API] Error in get_fun_challenge: {e}")
+        log.exception("[AGENTS API] Error in get_fun_challenge: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1054,7 +1045,7 @@ def get_conversation_starters():
         result = engagement_agent.get_conversation_starter_by_category(category)
         return jsonify(result), 200 if result.get('success') else 400
     except Exception as e:
-        print(f"[AGENTS API] Error in get_conversation_starters: {e}")
+        log.exception("[AGENTS API] Error in get_conversation_starters: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1067,7 +1058,7 @@ def get_booster_pack():
         result = engagement_agent.get_engagement_booster_pack(engagement_level)
         return jsonify(result), 200 if result.get('success') else 400
     except Exception as e:
-        print(f"[AGENTS API] Error in get_booster_pack: {e}")
+        log.exception("[AGENTS API] Error in get_booster_pack: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1106,7 +1097,7 @@ def log_activity():
         }), 200 if success else 500
         
     except Exception as e:
-        print(f"[AGENTS API] Error in log_activity: {e}")
+        log.exception("[AGENTS API] Error in log_activity: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1119,7 +1110,7 @@ def get_activity_stats(channel_id):
         result = engagement_agent.get_activity_stats(channel_id, days)
         return jsonify(result), 200 if result.get('success') else 400
     except Exception as e:
-        print(f"[AGENTS API] Error in get_activity_stats: {e}")
+        log.exception("[AGENTS API] Error in get_activity_stats: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1153,7 +1144,7 @@ def check_wellness():
         return jsonify(result), 200 if result.get('success') else 400
         
     except Exception as e:
-        print(f"[AGENTS API] Error in check_wellness: {e}")
+        log.exception("[AGENTS API] Error in check_wellness: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1292,9 +1283,7 @@ def analyze_wellness():
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in analyze_wellness: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in analyze_wellness: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1545,7 +1534,7 @@ def get_wellness_recommendations():
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_wellness_recommendations: {e}")
+        log.exception("[AGENTS API] Error in get_wellness_recommendations: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1591,7 +1580,7 @@ def get_wellness_insights(user_id):
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_wellness_insights: {e}")
+        log.exception("[AGENTS API] Error in get_wellness_insights: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1629,7 +1618,7 @@ def get_wellness_history():
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_wellness_history: {e}")
+        log.exception("[AGENTS API] Error in get_wellness_history: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1697,9 +1686,7 @@ def get_wellness_trends():
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_wellness_trends: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_wellness_trends: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -1994,9 +1981,7 @@ def get_knowledge_base(channel_id):
             }), 200
             
     except Exception as e:
-        print(f"[AGENTS API] Error in get_knowledge_base: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_knowledge_base: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
     finally:
         if conn:
@@ -2121,9 +2106,7 @@ def get_knowledge_insights():
         return jsonify({'success': True, 'insights': insights}), 200
 
     except Exception as e:
-        print(f"[AGENTS API] Error in get_knowledge_insights: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_knowledge_insights: %s", e)
         if conn:
             conn.close()
         return jsonify({'error': 'Internal server error'}), 500
@@ -2214,110 +2197,9 @@ def get_knowledge_topics():
         return jsonify({'success': True, 'topics': topics}), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_knowledge_topics: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_knowledge_topics: %s", e)
         if conn:
             conn.close()
-@jwt_required()
-def get_knowledge_base(channel_id):
-    """Get knowledge base for a channel"""
-    try:
-        username = get_jwt_identity()
-        limit = request.args.get('limit', 20, type=int)
-        
-        # Check access
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
-                return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
-            
-            cur.execute("""
-                SELECT 1 FROM channel_members 
-                WHERE channel_id = %s AND user_id = %s
-            """, (channel_id, user_id))
-            
-            if not cur.fetchone():
-                return jsonify({'error': 'Access denied'}), 403
-        
-        # Fetch knowledge_base entries for channel
-        knowledge_items = []
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT id, title, content, created_at
-                FROM knowledge_base
-                WHERE related_channel = %s
-                ORDER BY created_at DESC
-                LIMIT %s
-                """,
-                (channel_id, limit)
-            )
-            rows = cur.fetchall()
-            for r in rows:
-                try:
-                    payload = json.loads(r['content']) if r['content'] else {}
-                except Exception:
-                    payload = {}
-                # Map payload to frontend KnowledgeEntry shape
-                if payload.get('type') == 'qa':
-                    knowledge_items.append({
-                        'id': r['id'],
-                        'question': payload.get('question') or r['title'] or 'Q/A',
-                        'answer': payload.get('answer') or '',
-                        'tags': payload.get('tags') or [],
-                        'relevance_score': payload.get('relevance_score') or 0,
-                        'usage_count': payload.get('usage_count') or 0,
-                        'created_at': r['created_at'].isoformat() if r.get('created_at') else None
-                    })
-                elif payload.get('type') == 'topic':
-                    knowledge_items.append({
-                        'id': r['id'],
-                        'question': f"Topic: {payload.get('topic', r['title'] or 'Topic')}",
-                        'answer': payload.get('summary') or '',
-                        'tags': [payload.get('topic')] if payload.get('topic') else [],
-                        'relevance_score': 0,
-                        'usage_count': payload.get('message_count') or 0,
-                        'created_at': r['created_at'].isoformat() if r.get('created_at') else None
-                    })
-                elif payload.get('type') == 'decision':
-                    knowledge_items.append({
-                        'id': r['id'],
-                        'question': payload.get('decision') or r['title'] or 'Decision',
-                        'answer': '',
-                        'tags': payload.get('tags') or [],
-                        'relevance_score': 0,
-                        'usage_count': 0,
-                        'created_at': r['created_at'].isoformat() if r.get('created_at') else None
-                    })
-                elif payload.get('type') == 'resource':
-                    knowledge_items.append({
-                        'id': r['id'],
-                        'question': r['title'] or 'Resource',
-                        'answer': payload.get('url') or '',
-                        'tags': [],
-                        'relevance_score': 0,
-                        'usage_count': 0,
-                        'created_at': r['created_at'].isoformat() if r.get('created_at') else None
-                    })
-                else:
-                    knowledge_items.append({
-                        'id': r['id'],
-                        'question': r['title'] or 'Knowledge',
-                        'answer': '',
-                        'tags': [],
-                        'relevance_score': 0,
-                        'usage_count': 0,
-                        'created_at': r['created_at'].isoformat() if r.get('created_at') else None
-                    })
-        conn.close()
-        return jsonify({'success': True, 'knowledge': knowledge_items}), 200
-
-    except Exception as e:
-        print(f"[AGENTS API] Error in get_knowledge_base: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -2391,7 +2273,7 @@ def extract_knowledge_channel(channel_id):
 
         return jsonify({'success': True, 'knowledge': knowledge_out}), 200
     except Exception as e:
-        print(f"[AGENTS API] Error in extract_knowledge_channel: {e}")
+        log.exception("[AGENTS API] Error in extract_knowledge_channel: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -2481,7 +2363,7 @@ def extract_knowledge_time():
             'message': f'Extracted {total_faqs} FAQs, {total_definitions} definitions, and {total_decisions} decisions'
         }), 200
     except Exception as e:
-        print(f"[AGENTS API] Error in extract_knowledge_time: {e}")
+        log.exception("[AGENTS API] Error in extract_knowledge_time: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -2601,7 +2483,7 @@ def search_knowledge():
         conn.close()
         return jsonify({'success': True, 'results': results}), 200
     except Exception as e:
-        print(f"[AGENTS API] Error in search_knowledge: {e}")
+        log.exception("[AGENTS API] Error in search_knowledge: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -2619,7 +2501,7 @@ def analyze_focus():
         time_period_hours = data.get('time_period_hours', 1)
         channel_id = data.get('channel_id')
 
-        print(f"[AGENTS API] Focus analyze request: channel_id={channel_id}, hours={time_period_hours}")
+        log.debug("[AGENTS API] Focus analyze request: channel_id=%s, hours=%s", channel_id, time_period_hours)
 
         # Identify current user
         username = get_jwt_identity()
@@ -2628,7 +2510,7 @@ def analyze_focus():
             cur.execute("SELECT id FROM users WHERE username = %s", (username,))
             user_row = cur.fetchone()
             if not user_row:
-                print(f"[AGENTS API] User not found: {username}")
+                log.debug("[AGENTS API] User not found: %s", username)
                 return jsonify({'error': 'User not found'}), 404
             user_id = user_row['id']
 
@@ -2658,15 +2540,15 @@ def analyze_focus():
                         channel_id = member['channel_id']
 
             if not channel_id:
-                print(f"[AGENTS API] No channel found for user {user_id}")
+                log.debug("[AGENTS API] No channel found for user %s", user_id)
                 return jsonify({'error': 'No channel activity found. Provide channel_id to analyze focus.'}), 400
 
-            print(f"[AGENTS API] Analyzing channel {channel_id} for user {user_id}")
+            log.debug("[AGENTS API] Analyzing channel %s for user %s", channel_id, user_id)
 
         # Run analysis (focus_agent opens its own DB connection)
         result = focus_agent.analyze_focus(channel_id=channel_id, time_period_hours=time_period_hours)
 
-        print(f"[AGENTS API] Focus analysis result: success={result.get('success')}, error={result.get('error')}")
+        log.debug("[AGENTS API] Focus analysis result: success=%s, error=%s", result.get('success'), result.get('error'))
 
         # Format response to match frontend expectations
         if result.get('success'):
@@ -2689,16 +2571,14 @@ def analyze_focus():
                     'recommendations': [result.get('recommendation', 'No recommendations available')]
                 }
             }
-            print(f"[AGENTS API] Returning successful analysis: score={response_data['analysis']['focus_score']}")
+            log.debug("[AGENTS API] Returning successful analysis: score=%s", response_data['analysis']['focus_score'])
             return jsonify(response_data), 200
         else:
-            print(f"[AGENTS API] Analysis failed: {result.get('error')}")
+            log.warning("[AGENTS API] Analysis failed: %s", result.get('error'))
             return jsonify(result), 400
 
     except Exception as e:
-        print(f"[AGENTS API] Error in analyze_focus: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in analyze_focus: %s", e)
         return jsonify({'error': str(e)}), 500
     finally:
         if conn:
@@ -2712,7 +2592,7 @@ def get_focus_metrics():
         username = get_jwt_identity()
         days = request.args.get('days', 7, type=int)
         
-        print(f"[AGENTS API] Getting focus metrics for user: {username}, days: {days}")
+        log.debug("[AGENTS API] Getting focus metrics for user: %s, days: %s", username, days)
         
         # Return mock data with proper structure
         metrics = {
@@ -2727,9 +2607,7 @@ def get_focus_metrics():
         return jsonify(metrics), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_focus_metrics: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_focus_metrics: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -2740,7 +2618,7 @@ def get_focus_recommendations():
     try:
         username = get_jwt_identity()
         
-        print(f"[AGENTS API] Getting focus recommendations for user: {username}")
+        log.debug("[AGENTS API] Getting focus recommendations for user: %s", username)
         
         # Return helpful mock recommendations
         recommendations = [
@@ -2767,9 +2645,7 @@ def get_focus_recommendations():
         return jsonify(recommendations), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in get_focus_recommendations: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_focus_recommendations: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -2790,7 +2666,7 @@ def set_focus_goal():
         }), 200
         
     except Exception as e:
-        print(f"[AGENTS API] Error in set_focus_goal: {e}")
+        log.exception("[AGENTS API] Error in set_focus_goal: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -2873,9 +2749,7 @@ def get_knowledge_stats():
             }), 200
             
     except Exception as e:
-        print(f"[AGENTS API] Error in get_knowledge_stats: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_knowledge_stats: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
     finally:
         if conn:
@@ -2958,7 +2832,7 @@ def get_recent_knowledge():
                         'created_at': item['created_at'].isoformat() if hasattr(item['created_at'], 'isoformat') else str(item['created_at'])
                     })
                 except Exception as e:
-                    print(f"[KB Recent] Error parsing item {item['id']}: {e}")
+                    log.warning("[KB Recent] Error parsing item %s: %s", item['id'], e)
                     continue
             
             return jsonify({
@@ -2967,9 +2841,7 @@ def get_recent_knowledge():
             }), 200
             
     except Exception as e:
-        print(f"[AGENTS API] Error in get_recent_knowledge: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[AGENTS API] Error in get_recent_knowledge: %s", e)
         return jsonify({'error': 'Internal server error'}), 500
     finally:
         if conn:
@@ -5,22 +5,117 @@ from flask_jwt_extended import (
     create_access_token, create_refresh_token,
     jwt_required, get_jwt_identity, get_jwt, decode_token
 )
+from pymysql.err import IntegrityError
 from database import get_db_connection
-from services.otp_service import verify_otp
+from services.otp_service import create_and_store_otp, verify_otp
+from services.email_service import send_otp_email, send_verification_email
+from services.user_cache import get_profile, set_profile, invalidate_profile, lookup_user_id
+from services.password_hasher import hash_password, check_password, check_dummy, needs_rehash
 from services.session_manager import (
     create_session, rotate_refresh_token, revoke_session,
     revoke_all_sessions, get_active_sessions, revoke_session_by_id,
-    blocklist_access_token, check_refresh_rate_limit
+    mark_access_token_revoked, persist_blocklisted_token, check_refresh_rate_limit
 )
-from config import JWT_REFRESH_TOKEN_EXPIRES_DAYS
+from concurrent.futures import ThreadPoolExecutor
 import secrets
 from datetime import datetime, timedelta
 from utils import get_avatar_url, format_user_data
 from utils.validators import validate_email, validate_password_strength, validate_username
-import bcrypt
-import uuid
+from werkzeug.utils import secure_filename
+import os
+
+log = logging.getLogger(__name__)
+
+# Avatar uploads (served by app.py from /uploads/avatars)
+AVATAR_UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads', 'avatars')
+AVATAR_CHUNK_SIZE = 64 * 1024  # stream uploads to disk in 64KB chunks
+MAX_AVATAR_SIZE = 5 * 1024 * 1024  # 5MB
+
+os.makedirs(AVATAR_UPLOAD_FOLDER, exist_ok=True)
+
+EMAIL_VERIFICATION_TTL = timedelta(hours=24)
+
+# Writes the client doesn't wait on (logout, onboarding flag) run here so the
+# response goes out as soon as the JWT is accepted.
+_background = ThreadPoolExecutor(max_workers=4, thread_name_prefix='auth-bg')
+
+# ── Hot-path statements (built once; identical text on every request) ──
+# is_admin = owner of any community, fetched with the user row
+_LOGIN_SQL = """
+    SELECT u.id, u.username, u.email, u.display_name, u.bio, u.avatar_url,
+           u.status, u.custom_status, u.is_first_login, u.password,
+           u.email_verified,
+           EXISTS(SELECT 1 FROM community_members cm
+                  WHERE cm.user_id = u.id AND cm.role = 'owner') AS is_admin
+    FROM users u
+    WHERE u.username = %s OR u.email = %s
+    LIMIT 1
+"""
+_GET_ME_SQL = """
+    SELECT u.id, u.username, u.email, u.display_name, u.bio, u.avatar_url,
+           u.status, u.custom_status, u.is_first_login,
+           EXISTS(SELECT 1 FROM community_members cm
+                  WHERE cm.user_id = u.id AND cm.role = 'owner') AS is_admin
+    FROM users u
+    WHERE u.username = %s
+"""
+_CLEAR_FIRST_LOGIN_SQL = "UPDATE users SET is_first_login = 0 WHERE username = %s"
+
+# update_profile statements, precomputed for every non-empty subset of the
+# updatable columns. Key: bitmask (bit i set → _PROFILE_COLUMNS[i] is updated);
+# parameters are bound in _PROFILE_COLUMNS order, then the username.
+_PROFILE_COLUMNS = ('display_name', 'bio', 'avatar_url')
+_PROFILE_UPDATE_SQL = {
+    mask: "UPDATE users SET "
+          + ", ".join(f"{col} = %s" for i, col in enumerate(_PROFILE_COLUMNS) if mask & (1 << i))
+          + " WHERE username = %s"
+    for mask in range(1, 1 << len(_PROFILE_COLUMNS))
+}
+_PROFILE_CURRENT_SQL = (
+    "SELECT " + ", ".join(_PROFILE_COLUMNS) + " FROM users WHERE username = %s FOR UPDATE"
+)
+
+
+def _log_background_error(future):
+    exc = future.exception()
+    if exc is not None:
+        log.error("[AUTH] Background write failed: %s", exc, exc_info=exc)
 
-logging.basicConfig(level=logging.DEBUG)
+
+def _run_in_background(fn, *args):
+    """Fire-and-forget: run fn(*args) on the auth executor, logging failures."""
+    _background.submit(fn, *args).add_done_callback(_log_background_error)
+
+
+def _clear_first_login(username):
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(_CLEAR_FIRST_LOGIN_SQL, (username,))
+        conn.commit()
+    finally:
+        conn.close()
+    # Drop anything cached between the response and this commit
+    invalidate_profile(username)
+
+
+def _current_user_id():
+    """
+    Resolve the caller's user_id from the JWT 'uid' claim.
+    Falls back to the cached username lookup for tokens issued before the
+    claim existed.
+    Returns None if the user no longer exists.
+    """
+    uid = get_jwt().get('uid')
+    if uid is not None:
+        return uid
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            return lookup_user_id(cur, get_jwt_identity())
+    finally:
+        conn.close()
 
 
 # ----------------------------------------------------------------------
@@ -53,29 +148,22 @@ def signup():
         return jsonify({'error': msg}), 400
     # ── END validation ─────────────────────────────────────────────
 
+    # Hash before checking out a connection so bcrypt never holds a pool slot
+    hashed = hash_password(password)
+
+    # 🔥 FIX: Generate proper avatar URL
+    avatar_url = get_avatar_url(username)
+
+    # ── NEW: Generate email-verification token ─────────────
+    verification_token = secrets.token_urlsafe(48)
+    verification_expires = datetime.utcnow() + EMAIL_VERIFICATION_TTL
+    # ── END ────────────────────────────────────────────────
+
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            if cur.fetchone():
-                return jsonify({'error': 'User already exists'}), 400
-
-            if email:
-                cur.execute("SELECT id FROM users WHERE email = %s", (email,))
-                if cur.fetchone():
-                    return jsonify({'error': 'Email already in use'}), 400
-
-            hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            
-            # 🔥 FIX: Generate proper avatar URL
-            avatar_url = get_avatar_url(username)
-            print("[DEBUG] Generated avatar URL during signup:", avatar_url)
-
-            # ── NEW: Generate email-verification token ─────────────
-            verification_token = secrets.token_urlsafe(48)
-            verification_expires = datetime.utcnow() + timedelta(hours=24)
-            # ── END ────────────────────────────────────────────────
-            
+            # The UNIQUE keys on username/email do the existence check; a
+            # duplicate-key error names the key that clashed (username first)
             cur.execute(
                 """
                 INSERT INTO users (email, display_name, username, password, avatar_url, is_first_login,
@@ -86,19 +174,24 @@ def signup():
                  0, verification_token, verification_expires)
             )
         conn.commit()
-        print(f"[INFO] User registered: {username} with avatar: {avatar_url}")
-
-        # ── NEW: Send verification email (non-blocking on failure) ─
-        try:
-            from services.email_service import send_verification_email
-            frontend_url = request.headers.get('Origin', 'http://localhost:5173')
-            send_verification_email(email, verification_token, frontend_url)
-        except Exception as mail_err:
-            logging.warning(f"[SIGNUP] Verification email failed for {email}: {mail_err}")
-        # ── END ────────────────────────────────────────────────────
-
+    except IntegrityError as e:
+        conn.rollback()
+        if e.args[0] != 1062:  # ER_DUP_ENTRY
+            raise
+        if str(e.args[1]).endswith(("key 'email'", ".email'")):
+            return jsonify({'error': 'Email already in use'}), 400
+        return jsonify({'error': 'User already exists'}), 400
     finally:
         conn.close()
+    log.info("[SIGNUP] User registered: %s", username)
+
+    # ── NEW: Send verification email (non-blocking on failure) ─
+    try:
+        frontend_url = request.headers.get('Origin', 'http://localhost:5173')
+        send_verification_email(email, verification_token, frontend_url)
+    except Exception as mail_err:
+        log.warning("[SIGNUP] Verification email failed for %s: %s", email, mail_err)
+    # ── END ────────────────────────────────────────────────────
 
     return jsonify({
         'message': 'Account created! Please check your email to verify your account.',
@@ -116,57 +209,59 @@ def login():
     if not identifier or not password:
         return jsonify({'error': 'username (or email) and password are required'}), 400
 
+    password_bytes = password.encode('utf-8')  # reused by check + rehash
+
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT id, username, email, display_name, bio, avatar_url, 
-                       status, custom_status, is_first_login, password,
-                       email_verified
-                FROM users 
-                WHERE username = %s OR email = %s
-                """,
-                (identifier, identifier)
-            )
+            cur.execute(_LOGIN_SQL, (identifier, identifier))
             row = cur.fetchone()
-            if not row:
-                return jsonify({'error': 'Invalid credentials'}), 401
-
-            stored_hash = row['password']
-            if not bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8')):
-                return jsonify({'error': 'Invalid credentials'}), 401
-
-            # ── NEW: Block login if email is not verified ──────────
-            if not row.get('email_verified', 1):
-                return jsonify({
-                    'error': 'Please verify your email before logging in. Check your inbox for a verification link.',
-                    'code': 'EMAIL_NOT_VERIFIED',
-                    'email': row.get('email', '')
-                }), 403
-            # ── END ────────────────────────────────────────────────
-
-            token = create_access_token(identity=row['username'])
-            cur.execute("UPDATE users SET token = %s WHERE username = %s", (token, row['username']))
-            
-            # Check if user is admin (owner of any community)
-            cur.execute(
-                "SELECT 1 FROM community_members WHERE user_id = %s AND role = 'owner' LIMIT 1",
-                (row['id'],)
-            )
-            is_admin = cur.fetchone() is not None
-        conn.commit()
     finally:
         conn.close()
 
+    # bcrypt runs after the connection is back in the pool
+    if not row:
+        check_dummy(password_bytes)  # equalize timing with the wrong-password path
+        return jsonify({'error': 'Invalid credentials'}), 401
+
+    stored_hash = row['password']
+    if not check_password(password_bytes, stored_hash):
+        return jsonify({'error': 'Invalid credentials'}), 401
+
+    # ── NEW: Block login if email is not verified ──────────
+    if not row.get('email_verified', 1):
+        return jsonify({
+            'error': 'Please verify your email before logging in. Check your inbox for a verification link.',
+            'code': 'EMAIL_NOT_VERIFIED',
+            'email': row.get('email', '')
+        }), 403
+    # ── END ────────────────────────────────────────────────
+
+    # Transparently upgrade hashes stored at a lower cost ("$2b$NN$...")
+    if needs_rehash(stored_hash):
+        new_hash = hash_password(password_bytes)
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("UPDATE users SET password = %s WHERE id = %s", (new_hash, row['id']))
+            conn.commit()
+        finally:
+            conn.close()
+
+    token = create_access_token(identity=row['username'], additional_claims={'uid': row['id']})
+
+    # Admin = owner of any community (fetched with the user row)
+    is_admin = bool(row['is_admin'])
+
     # ── Create refresh token & session ─────────────────────────────
-    refresh_token = create_refresh_token(identity=row['username'])
+    refresh_token = create_refresh_token(identity=row['username'], additional_claims={'uid': row['id']})
     refresh_decoded = decode_token(refresh_token)
     refresh_jti = refresh_decoded['jti']
 
     device_info = request.headers.get('User-Agent', 'Unknown')[:500]
     ip_address = request.remote_addr
-    refresh_expires = datetime.utcnow() + timedelta(days=JWT_REFRESH_TOKEN_EXPIRES_DAYS)
+    # Session expiry mirrors the token's own exp claim (Unix seconds)
+    refresh_expires = datetime.utcfromtimestamp(refresh_decoded['exp'])
 
     create_session(
         user_id=row['id'],
@@ -182,8 +277,9 @@ def login():
     user_data = format_user_data(row)
     user_data['is_first_login'] = bool(row.get('is_first_login', False))
     user_data['role'] = 'admin' if is_admin else 'user'
-    
-    print(f"[LOGIN] User: {user_data['username']}, Role: {user_data['role']}, Is Admin: {is_admin}")
+    set_profile(user_data['username'], user_data)
+
+    log.debug("[LOGIN] User: %s, Role: %s", user_data['username'], user_data['role'])
 
     return jsonify({
         "token": token,
@@ -197,16 +293,17 @@ def login():
 @jwt_required()
 def update_first_login():
     current_user = get_jwt_identity()
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
-                "UPDATE users SET is_first_login = %s WHERE username = %s",
-                (0, current_user)
-            )
-        conn.commit()
-    finally:
-        conn.close()
+
+    # Onboarding already completed — nothing to write
+    cached = get_profile(current_user)
+    if cached is not None and not cached.get('is_first_login'):
+        return jsonify({'message': 'First login flag updated'}), 200
+
+    # Reflect the change in the cached /me payload right away; the UPDATE is queued
+    if cached is not None:
+        cached['is_first_login'] = False
+        set_profile(current_user, cached)
+    _run_in_background(_clear_first_login, current_user)
     return jsonify({'message': 'First login flag updated'}), 200
 
 # ----------------------------------------------------------------------
@@ -214,29 +311,18 @@ def update_first_login():
 # ----------------------------------------------------------------------
 @jwt_required()
 def logout():
-    current_user = get_jwt_identity()
     jwt_data = get_jwt()
-
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            # Get user ID for session operations
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            user_row = cur.fetchone()
-            user_id = user_row['id'] if user_row else None
-
-            # Clear stored token (backward compat)
-            cur.execute("UPDATE users SET token = NULL WHERE username = %s", (current_user,))
-        conn.commit()
-    finally:
-        conn.close()
+    user_id = _current_user_id()
+    invalidate_profile(get_jwt_identity())
 
     if user_id:
-        # Blocklist the current access token so it can't be reused
+        # Blocklist the current access token so it can't be reused.
+        # The in-memory blocklist takes effect now; the DB row is written async.
         access_jti = jwt_data.get('jti')
         if access_jti:
             access_exp = datetime.utcfromtimestamp(jwt_data.get('exp', 0))
-            blocklist_access_token(access_jti, user_id, access_exp)
+            mark_access_token_revoked(access_jti, access_exp)
+            _run_in_background(persist_blocklisted_token, access_jti, user_id, access_exp)
 
         # Revoke the refresh token if the client sends it
         body = request.get_json(silent=True) or {}
@@ -246,7 +332,7 @@ def logout():
                 refresh_decoded = decode_token(refresh_token_raw)
                 refresh_jti = refresh_decoded.get('jti')
                 if refresh_jti:
-                    revoke_session(refresh_jti, user_id)
+                    _run_in_background(revoke_session, refresh_jti, user_id)
             except Exception:
                 pass  # Invalid/expired refresh token — still complete logout
 
@@ -258,29 +344,23 @@ def logout():
 @jwt_required()
 def get_me():
     current_user = get_jwt_identity()
+
+    # ?fresh=1 skips the cache (e.g. right after a write from another device)
+    if request.args.get('fresh') != '1':
+        cached = get_profile(current_user)
+        if cached is not None:
+            return jsonify(cached), 200
+
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT id, username, email, display_name, bio, avatar_url,
-                       status, custom_status, is_first_login
-                FROM users 
-                WHERE username = %s
-                """,
-                (current_user,)
-            )
+            cur.execute(_GET_ME_SQL, (current_user,))
             row = cur.fetchone()
             if not row:
                 return jsonify({'error': 'User not found'}), 404
-            
-            # Check if user is admin (owner of any community)
-            user_id = row['id']
-            cur.execute(
-                "SELECT 1 FROM community_members WHERE user_id = %s AND role = 'owner' LIMIT 1",
-                (user_id,)
-            )
-            is_admin = cur.fetchone() is not None
+
+            # Admin = owner of any community (fetched with the user row)
+            is_admin = bool(row['is_admin'])
     finally:
         conn.close()
 
@@ -288,8 +368,9 @@ def get_me():
     user_data = format_user_data(row)
     user_data['is_first_login'] = bool(row.get('is_first_login', False))
     user_data['role'] = 'admin' if is_admin else 'user'
-    
-    print(f"[GET_ME] User: {user_data['username']}, Role: {user_data['role']}, Is Admin: {is_admin}")
+    set_profile(current_user, user_data)
+
+    log.debug("[GET_ME] User: %s, Role: %s", user_data['username'], user_data['role'])
 
     return jsonify(user_data), 200
 
@@ -297,10 +378,7 @@ def get_me():
 # forgot-password
 #----------------------------------------------------------------------------------
 def forgot_password():
-    from services.email_service import send_otp_email
-    from services.otp_service import create_and_store_otp
-    
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     email = data.get("email")
 
     if not email:
@@ -309,28 +387,24 @@ def forgot_password():
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT * FROM users WHERE email=%s", (email,))
-            user = cur.fetchone()
-
-            if not user:
-                return jsonify({"error": "User not found"}), 404
-
-            # Generate 6-digit OTP using otp_service
-            otp = create_and_store_otp(email)
-            
-            # Send OTP via email
-            send_otp_email(email, otp)
+            cur.execute("SELECT 1 FROM users WHERE email=%s LIMIT 1", (email,))
+            exists = cur.fetchone()
     finally:
         conn.close()
+    if not exists:
+        return jsonify({"error": "User not found"}), 404
+
+    # OTP storage takes its own connection and SMTP can stall — neither
+    # should hold this request's pool slot
+    otp = create_and_store_otp(email)
+    send_otp_email(email, otp)
 
     return jsonify({
         "message": "Reset password OTP has been sent to your email"
     }), 200
 
 def verify_otp_endpoint():
-    from services.otp_service import verify_otp
-    
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     email = data.get("email")
     otp = data.get("otp")
 
@@ -352,67 +426,48 @@ def verify_otp_endpoint():
 #------------------------------------------------------------------------
 
 def reset_password():
-    logging.debug("========== Reset Password API Called ==========")
-
-    data = request.get_json()
-    logging.debug(f"Incoming Request Data: {data}")
+    data = request.get_json(silent=True) or {}
 
     email = data.get("email")
     otp = data.get("otp")
     new_password = data.get("new_password")
 
     if not email or not otp or not new_password:
-        logging.error("Missing fields: Email, OTP, or Password not provided.")
         return jsonify({"error": "Email, OTP, and new password are required"}), 400
 
     # OTP validation
-    logging.debug(f"Verifying OTP for email: {email}, OTP: {otp}")
     valid, error_msg = verify_otp(email, otp)
 
-    logging.debug(f"OTP Verification result: valid={valid}, message={error_msg}")
-
     if not valid:
-        logging.error(f"OTP Validation Failed: {error_msg}")
+        log.info("[RESET] OTP validation failed for %s: %s", email, error_msg)
         return jsonify({"error": error_msg}), 400
 
+    # Password hashing (before checkout, so bcrypt never holds a pool slot)
+    hashed_pw = hash_password(new_password)
+
     # Updating password in DB
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            logging.debug(f"Checking if user exists for email: {email}")
             cur.execute("SELECT id FROM users WHERE email=%s", (email,))
             user = cur.fetchone()
 
-            logging.debug(f"User lookup result: {user}")
-
             if not user:
-                logging.error("User not found in database.")
                 return jsonify({"error": "User not found"}), 404
 
-            # Password hashing
-            hashed_pw = bcrypt.hashpw(new_password.encode("utf-8"), bcrypt.gensalt()).decode('utf-8')
-            logging.debug(f"Generated hashed password: {hashed_pw}")
-
-            logging.debug("Updating user password in database...")
             cur.execute("UPDATE users SET password=%s WHERE id=%s", (hashed_pw, user["id"]))
-
-            logging.debug("Deleting OTP from otp_store for this email...")
             cur.execute("DELETE FROM otp_codes WHERE email=%s", (email,))
 
-
         conn.commit()
-        logging.debug("Password update committed to DB successfully.")
 
     except Exception as e:
-        logging.exception("Unexpected error during password reset")
+        log.exception("Unexpected error during password reset")
         return jsonify({"error": "Internal Server Error", "details": str(e)}), 500
 
     finally:
         conn.close()
-        logging.debug("Database connection closed.")
 
-    logging.debug("Password reset successfully completed.")
-    logging.debug("==============================================")
+    log.info("[RESET] Password reset for %s", email)
 
     return jsonify({"message": "Password reset successfully"}), 200
 
@@ -427,12 +482,17 @@ def update_profile():
     current_user = get_jwt_identity()
     
     # Check if it's a file upload (multipart/form-data) or JSON
-    if request.content_type and 'multipart/form-data' in request.content_type:
+    if request.mimetype == 'multipart/form-data':
+        # Reject oversized uploads before the body is parsed/spooled
+        if request.content_length and request.content_length > MAX_AVATAR_SIZE:
+            return jsonify({'error': 'File too large. Maximum 5MB allowed'}), 400
+
         # Handle file upload
-        display_name = request.form.get('display_name')
-        bio = request.form.get('bio')
+        form = request.form
+        display_name = form.get('display_name')
+        bio = form.get('bio')
         avatar_file = request.files.get('avatar')
-        remove_avatar = request.form.get('remove_avatar') == 'true'
+        remove_avatar = form.get('remove_avatar') == 'true'
         
         avatar_url = None
         
@@ -441,26 +501,33 @@ def update_profile():
             avatar_url = None
         elif avatar_file:
             # Handle file upload - save to uploads directory
-            import os
-            from werkzeug.utils import secure_filename
-            
-            # Create uploads directory if it doesn't exist
-            upload_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads', 'avatars')
-            os.makedirs(upload_dir, exist_ok=True)
-            
-            # Generate unique filename
             ext = os.path.splitext(avatar_file.filename)[1]
-            filename = f"{current_user}_{int(datetime.now().timestamp())}{ext}"
-            filepath = os.path.join(upload_dir, secure_filename(filename))
+            # Random token keeps same-second uploads from overwriting each other
+            filename = secure_filename(f"{current_user}_{secrets.token_hex(8)}{ext}")
+            filepath = os.path.join(AVATAR_UPLOAD_FOLDER, filename)
             
-            # Save file
-            avatar_file.save(filepath)
+            # Stream to disk in fixed-size chunks (constant memory per upload).
+            # Content-Length is absent on chunked bodies, so the cap is
+            # enforced on the bytes actually written.
+            written = 0
+            with open(filepath, 'wb') as f:
+                while True:
+                    chunk = avatar_file.stream.read(AVATAR_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > MAX_AVATAR_SIZE:
+                        break
+                    f.write(chunk)
+            if written > MAX_AVATAR_SIZE:
+                os.remove(filepath)
+                return jsonify({'error': 'File too large. Maximum 5MB allowed'}), 400
             
             # Store relative URL path
-            avatar_url = f"/uploads/avatars/{secure_filename(filename)}"
+            avatar_url = f"/uploads/avatars/{filename}"
     else:
         # Handle JSON request
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         display_name = data.get('display_name')
         bio = data.get('bio')
         avatar_url = data.get('avatar_url')
@@ -473,33 +540,41 @@ def update_profile():
     if not any([display_name, bio, avatar_url is not None, remove_avatar]):
         return jsonify({'error': 'At least one field (display_name, bio, or avatar_url) is required'}), 400
     
+    requested = {}
+    if display_name is not None:
+        requested['display_name'] = display_name
+    if bio is not None:
+        requested['bio'] = bio
+    if avatar_url is not None or remove_avatar:
+        requested['avatar_url'] = avatar_url
+    
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
-            # Build dynamic update query based on what fields are provided
-            update_fields = []
-            update_values = []
+            # Lock the row and drop fields that already hold the requested value,
+            # so idempotent saves don't rewrite the row or invalidate caches
+            cur.execute(_PROFILE_CURRENT_SQL, (current_user,))
+            current = cur.fetchone()
             
-            if display_name is not None:
-                update_fields.append('display_name = %s')
-                update_values.append(display_name)
-            
-            if bio is not None:
-                update_fields.append('bio = %s')
-                update_values.append(bio)
-            
-            if avatar_url is not None or remove_avatar:
-                update_fields.append('avatar_url = %s')
-                update_values.append(avatar_url)
-            
-            update_values.append(current_user)
+            # Pick the precomputed statement for the fields that actually change
+            mask = 0
+            update_values = []
+            for i, col in enumerate(_PROFILE_COLUMNS):
+                if col in requested and (current is None or current[col] != requested[col]):
+                    mask |= 1 << i
+                    update_values.append(requested[col])
             
-            query = f"UPDATE users SET {', '.join(update_fields)} WHERE username = %s"
-            cur.execute(query, update_values)
+            if mask:
+                update_values.append(current_user)
+                cur.execute(_PROFILE_UPDATE_SQL[mask], tuple(update_values))
         
-        conn.commit()
+        if mask:
+            conn.commit()
+            invalidate_profile(current_user)
+        else:
+            conn.rollback()
     except Exception as e:
-        logging.error(f"Error updating profile: {str(e)}")
+        log.error("Error updating profile: %s", e)
         return jsonify({'error': 'Failed to update profile'}), 500
     finally:
         conn.close()
@@ -518,8 +593,9 @@ def verify_email():
     Verify a user's email via the token sent during signup.
     Query params: token, email
     """
-    token = request.args.get('token') or (request.get_json() or {}).get('token')
-    email = request.args.get('email') or (request.get_json() or {}).get('email')
+    body = request.get_json(silent=True) or {}
+    token = request.args.get('token') or body.get('token')
+    email = request.args.get('email') or body.get('email')
 
     if not token or not email:
         return jsonify({'error': 'Verification token and email are required'}), 400
@@ -563,7 +639,7 @@ def verify_email():
                 (user['id'],)
             )
         conn.commit()
-        logging.info(f"[VERIFY] Email verified for {email}")
+        log.info("[VERIFY] Email verified for %s", email)
     finally:
         conn.close()
 
@@ -598,7 +674,7 @@ def resend_verification():
 
             # Generate new token
             new_token = secrets.token_urlsafe(48)
-            new_expires = datetime.utcnow() + timedelta(hours=24)
+            new_expires = datetime.utcnow() + EMAIL_VERIFICATION_TTL
             cur.execute(
                 """
                 UPDATE users
@@ -611,11 +687,10 @@ def resend_verification():
 
         # Send email
         try:
-            from services.email_service import send_verification_email
             frontend_url = request.headers.get('Origin', 'http://localhost:5173')
             send_verification_email(email, new_token, frontend_url)
         except Exception as mail_err:
-            logging.warning(f"[RESEND] Verification email failed for {email}: {mail_err}")
+            log.warning("[RESEND] Verification email failed for %s: %s", email, mail_err)
 
     finally:
         conn.close()
@@ -646,22 +721,17 @@ def refresh():
         return jsonify({'error': 'Too many refresh attempts. Try again later.'}), 429
 
     # Resolve user_id
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            user_row = cur.fetchone()
-            if not user_row:
-                return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
-    finally:
-        conn.close()
+    user_id = _current_user_id()
+    if user_id is None:
+        return jsonify({'error': 'User not found'}), 404
 
     # Create new token pair
-    new_access_token = create_access_token(identity=current_user)
-    new_refresh_token = create_refresh_token(identity=current_user)
-    new_refresh_jti = decode_token(new_refresh_token)['jti']
-    new_expires = datetime.utcnow() + timedelta(days=JWT_REFRESH_TOKEN_EXPIRES_DAYS)
+    claims = {'uid': user_id}
+    new_access_token = create_access_token(identity=current_user, additional_claims=claims)
+    new_refresh_token = create_refresh_token(identity=current_user, additional_claims=claims)
+    new_refresh_decoded = decode_token(new_refresh_token)
+    new_refresh_jti = new_refresh_decoded['jti']
+    new_expires = datetime.utcfromtimestamp(new_refresh_decoded['exp'])
 
     # Rotate: revoke old refresh, store new (with reuse detection)
     result = rotate_refresh_token(old_jti, new_refresh_jti, new_expires, user_id)
@@ -674,16 +744,6 @@ def refresh():
             }), 401
         return jsonify({'error': 'Invalid refresh token'}), 401
 
-    # Update users.token for backward compat
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("UPDATE users SET token = %s WHERE username = %s",
-                        (new_access_token, current_user))
-        conn.commit()
-    finally:
-        conn.close()
-
     return jsonify({
         'token': new_access_token,
         'refresh_token': new_refresh_token,
@@ -696,19 +756,11 @@ def refresh():
 @jwt_required()
 def get_sessions():
     """List all active sessions for the current user (multi-device view)."""
-    current_user = get_jwt_identity()
-
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            user_row = cur.fetchone()
-            if not user_row:
-                return jsonify({'error': 'User not found'}), 404
-            sessions = get_active_sessions(user_row['id'])
-    finally:
-        conn.close()
+    user_id = _current_user_id()
+    if user_id is None:
+        return jsonify({'error': 'User not found'}), 404
 
+    sessions = get_active_sessions(user_id)
     return jsonify({'sessions': sessions}), 200
 
 
@@ -718,24 +770,17 @@ def get_sessions():
 @jwt_required()
 def revoke_session_endpoint():
     """Revoke a specific session by its database row ID."""
-    current_user = get_jwt_identity()
     data = request.get_json() or {}
     session_id = data.get('session_id')
 
     if not session_id:
         return jsonify({'error': 'session_id is required'}), 400
 
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            user_row = cur.fetchone()
-            if not user_row:
-                return jsonify({'error': 'User not found'}), 404
-    finally:
-        conn.close()
+    user_id = _current_user_id()
+    if user_id is None:
+        return jsonify({'error': 'User not found'}), 404
 
-    success = revoke_session_by_id(session_id, user_row['id'])
+    success = revoke_session_by_id(session_id, user_id)
     if success:
         return jsonify({'message': 'Session revoked'}), 200
     return jsonify({'error': 'Session not found or already revoked'}), 404
@@ -747,17 +792,9 @@ def revoke_session_endpoint():
 @jwt_required()
 def revoke_all_sessions_endpoint():
     """Revoke ALL sessions for the current user. Forces re-login on every device."""
-    current_user = get_jwt_identity()
-
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            user_row = cur.fetchone()
-            if not user_row:
-                return jsonify({'error': 'User not found'}), 404
-    finally:
-        conn.close()
+    user_id = _current_user_id()
+    if user_id is None:
+        return jsonify({'error': 'User not found'}), 404
 
-    count = revoke_all_sessions(user_row['id'])
+    count = revoke_all_sessions(user_id)
     return jsonify({'message': f'Revoked {count} sessions', 'revoked_count': count}), 200
\ No newline at end of file
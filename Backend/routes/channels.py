@@ -1,12 +1,21 @@
 # routes/channels.py - Complete with Member Management
 from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from pymysql.cursors import Cursor
 from database import get_db_connection
+from services.user_cache import invalidate_profile, jwt_user_id
+from services.community_cache import (
+    get_members, set_members, members_for_viewer, get_details, set_details,
+    get_user_communities, set_user_communities, invalidate_community,
+)
+from services.image_processor import process_image
+from utils import get_avatar_url
 from werkzeug.utils import secure_filename
+import logging
 import os
 import uuid
-from PIL import Image
-import io
+
+log = logging.getLogger(__name__)
 
 # Configuration for uploads
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads', 'communities')
@@ -17,34 +26,72 @@ BANNER_SIZE = (1200, 400)
 
 # Ensure upload directory exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-print(f"[INFO] Upload folder: {UPLOAD_FOLDER}")
+log.info("[CHANNELS] Upload folder: %s", UPLOAD_FOLDER)
+
+# ── Hot-path statements (built once; identical text on every request) ──
+_MEMBER_ROLE_SQL = "SELECT role FROM community_members WHERE community_id = %s AND user_id = %s"
+_ADD_COMMUNITY_MEMBER_SQL = (
+    "INSERT INTO community_members (community_id, user_id, role) VALUES (%s, %s, 'member')"
+)
+# Channel fan-out done server-side: new channel ← every community member
+# (admins/owners become channel admins), new member ← every channel
+_SEED_CHANNEL_MEMBERS_SQL = """
+    INSERT IGNORE INTO channel_members (channel_id, user_id, role)
+    SELECT %s, user_id, CASE WHEN role IN ('admin', 'owner') THEN 'admin' ELSE 'member' END
+    FROM community_members
+    WHERE community_id = %s
+"""
+_ADD_TO_ALL_CHANNELS_SQL = """
+    INSERT IGNORE INTO channel_members (channel_id, user_id, role)
+    SELECT id, %s, 'member' FROM channels WHERE community_id = %s
+"""
+
+# update_community statements, precomputed for every non-empty subset of the
+# updatable columns (same scheme as auth's _PROFILE_UPDATE_SQL). Key: bitmask
+# (bit i set → _COMMUNITY_COLUMNS[i] is updated); parameters are bound in
+# _COMMUNITY_COLUMNS order, then the community id.
+_COMMUNITY_COLUMNS = ('name', 'description', 'icon', 'color')
+_COMMUNITY_UPDATE_SQL = {
+    mask: "UPDATE communities SET "
+          + ", ".join(f"{col} = %s" for i, col in enumerate(_COMMUNITY_COLUMNS) if mask & (1 << i))
+          + " WHERE id = %s"
+    for mask in range(1, 1 << len(_COMMUNITY_COLUMNS))
+}
+
+# get_communities: the caller's communities with member/channel counts
+# (counted per joined community — index seeks on community_id, not an
+# aggregate over the whole members/channels tables). Built once for each
+# paging mode (full list / first page / page after a community id).
+_COMMUNITIES_BASE_SQL = """
+    SELECT
+        c.id, c.name, c.description, c.icon, c.color,
+        c.logo_url, c.banner_url, cm.role, c.created_at,
+        (SELECT COUNT(*) FROM community_members m
+         WHERE m.community_id = c.id) as member_count,
+        (SELECT COUNT(*) FROM channels ch
+         WHERE ch.community_id = c.id) as channel_count
+    FROM community_members cm
+    JOIN communities c ON c.id = cm.community_id
+    WHERE cm.user_id = %s
+      AND NOT EXISTS (SELECT 1 FROM blocked_users bu
+                      WHERE bu.community_id = c.id AND bu.user_id = %s)
+"""
+_COMMUNITIES_ORDER_SQL = " ORDER BY c.created_at ASC, c.id ASC"
+_COMMUNITIES_SQL = _COMMUNITIES_BASE_SQL + _COMMUNITIES_ORDER_SQL
+_COMMUNITIES_PAGE_SQL = _COMMUNITIES_SQL + " LIMIT %s"
+_COMMUNITIES_PAGE_AFTER_SQL = (
+    _COMMUNITIES_BASE_SQL
+    + "      AND (c.created_at, c.id) > (SELECT created_at, id FROM communities WHERE id = %s)\n"
+    + _COMMUNITIES_ORDER_SQL + " LIMIT %s"
+)
+
+def _escape_like(value):
+    """Escape LIKE wildcards so user input only ever matches literally."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def process_image(file, max_size, maintain_aspect=True):
-    """Process and resize image while maintaining quality"""
-    try:
-        img = Image.open(file)
-        
-        # Convert to RGB if necessary (for PNG with transparency)
-        if img.mode in ('RGBA', 'P'):
-            img = img.convert('RGB')
-        
-        if maintain_aspect:
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-        else:
-            img = img.resize(max_size, Image.Resampling.LANCZOS)
-        
-        # Save to bytes
-        output = io.BytesIO()
-        img.save(output, format='JPEG', quality=85, optimize=True)
-        output.seek(0)
-        return output
-    except Exception as e:
-        print(f"[ERROR] process_image: {e}")
-        return None
-
 
 # =====================================
 # GET ALL COMMUNITIES FOR USER
@@ -53,55 +100,61 @@ def process_image(file, max_size, maintain_aspect=True):
 def get_communities():
     conn = None
     try:
-        username = get_jwt_identity()
+        # Optional keyset paging: ?limit=N[&after=<last community id>].
+        # Without limit the full list is returned, as before.
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after', type=int)
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
-            cur.execute("""
-                SELECT 
-                    c.id, c.name, c.description, c.icon, c.color, 
-                    c.logo_url, c.banner_url, cm.role, c.created_at,
-                    COALESCE(mc.member_count, 0) as member_count,
-                    COALESCE(cc.channel_count, 0) as channel_count
-                FROM communities c
-                JOIN community_members cm ON c.id = cm.community_id
-                LEFT JOIN blocked_users bu ON c.id = bu.community_id AND bu.user_id = %s
-                LEFT JOIN (
-                    SELECT community_id, COUNT(*) as member_count
-                    FROM community_members GROUP BY community_id
-                ) mc ON mc.community_id = c.id
-                LEFT JOIN (
-                    SELECT community_id, COUNT(*) as channel_count
-                    FROM channels GROUP BY community_id
-                ) cc ON cc.community_id = c.id
-                WHERE cm.user_id = %s AND bu.user_id IS NULL
-                ORDER BY c.created_at ASC
-            """, (user_id, user_id))
+        if not limit:
+            cached = get_user_communities(user_id)
+            if cached is not None:
+                return jsonify(cached), 200
+
+        # Tuple rows: the response dict below is the only per-row dict built
+        with conn.cursor(Cursor) as cur:
+            params = [user_id, user_id]
+            if limit:
+                limit = min(max(limit, 1), 100)
+                if after:
+                    sql = _COMMUNITIES_PAGE_AFTER_SQL
+                    params.append(after)
+                else:
+                    sql = _COMMUNITIES_PAGE_SQL
+                params.append(limit)
+            else:
+                sql = _COMMUNITIES_SQL
+            cur.execute(sql, params)
             communities = cur.fetchall()
 
         result = [{
-            'id': c['id'],
-            'name': c['name'],
-            'description': c['description'],
-            'icon': c['icon'],
-            'color': c['color'],
-            'logo_url': c['logo_url'],
-            'banner_url': c['banner_url'],
-            'role': c['role'],
-            'created_at': c['created_at'].isoformat() if c['created_at'] else None,
-            'member_count': c['member_count'],
-            'channel_count': c['channel_count']
-        } for c in communities]
+            'id': cid,
+            'name': name,
+            'description': description,
+            'icon': icon,
+            'color': color,
+            'logo_url': logo_url,
+            'banner_url': banner_url,
+            'role': role,
+            'created_at': created_at.isoformat() if created_at else None,
+            'member_count': member_count,
+            'channel_count': channel_count
+        } for (cid, name, description, icon, color, logo_url, banner_url,
+               role, created_at, member_count, channel_count) in communities]
 
-        return jsonify(result), 200
+        if not limit:
+            set_user_communities(user_id, result)
+        response = jsonify(result)
+        if limit and len(result) == limit:
+            response.headers['X-Next-Cursor'] = str(result[-1]['id'])
+        return response, 200
 
     except Exception as e:
-        print(f"[ERROR] get_communities: {e}")
+        log.exception("[CHANNELS] get_communities: %s", e)
         return jsonify({'error': 'Failed to fetch communities'}), 500
     finally:
         if conn:
@@ -115,28 +168,25 @@ def get_communities():
 def get_community_channels(community_id):
     conn = None
     try:
-        username = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
-
-            # Check membership
-            cur.execute("SELECT 1 FROM community_members WHERE community_id = %s AND user_id = %s",
-                        (community_id, user_id))
-            if not cur.fetchone():
-                return jsonify({'error': 'Access denied'}), 403
 
+            # Membership check and channel list in one round-trip:
+            # no rows → not a member; a single NULL row → member, no channels
             cur.execute("""
-                SELECT id, name, type, description, created_at
-                FROM channels 
-                WHERE community_id = %s
-                ORDER BY name ASC
-            """, (community_id,))
-            channels = cur.fetchall()
+                SELECT ch.id, ch.name, ch.type, ch.description, ch.created_at
+                FROM community_members cm
+                LEFT JOIN channels ch ON ch.community_id = cm.community_id
+                WHERE cm.community_id = %s AND cm.user_id = %s
+                ORDER BY ch.name ASC
+            """, (community_id, user_id))
+            rows = cur.fetchall()
+            if not rows:
+                return jsonify({'error': 'Access denied'}), 403
+            channels = [ch for ch in rows if ch['id'] is not None]
 
         result = [{
             'id': ch['id'],
@@ -149,7 +199,7 @@ def get_community_channels(community_id):
         return jsonify(result), 200
 
     except Exception as e:
-        print(f"[ERROR] get_community_channels: {e}")
+        log.exception("[CHANNELS] get_community_channels: %s", e)
         return jsonify({'error': 'Failed to fetch channels'}), 500
     finally:
         if conn:
@@ -163,7 +213,6 @@ def get_community_channels(community_id):
 def create_channel(community_id):
     conn = None
     try:
-        username = get_jwt_identity()
         data = request.get_json() or {}
         name = data.get('name')
         channel_type = data.get('type', 'text')
@@ -177,15 +226,12 @@ def create_channel(community_id):
         conn = get_db_connection()
         with conn.cursor() as cur:
             # Get user info
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
             # Check permissions
-            cur.execute("SELECT role FROM community_members WHERE community_id = %s AND user_id = %s",
-                        (community_id, user_id))
+            cur.execute(_MEMBER_ROLE_SQL, (community_id, user_id))
             member = cur.fetchone()
             if not member or member['role'] not in ['admin', 'owner']:
                 return jsonify({'error': 'Permission denied'}), 403
@@ -196,34 +242,17 @@ def create_channel(community_id):
                 VALUES (%s, %s, %s, %s, %s)
             """, (community_id, name, channel_type, description, user_id))
             channel_id = cur.lastrowid
-            print(f"[INFO] Created channel {channel_id}: {name}")
+            log.info("[CHANNELS] Created channel %s: %s", channel_id, name)
 
-            # 🔥 FIX: 2. Get ALL members of this community
-            cur.execute("""
-                SELECT user_id, role FROM community_members 
-                WHERE community_id = %s
-            """, (community_id,))
-            community_members = cur.fetchall()
+            # 🔥 FIX: 2. Add ALL community members to this channel
+            cur.execute(_SEED_CHANNEL_MEMBERS_SQL, (channel_id, community_id))
+            members_added = cur.rowcount
 
-            # 🔥 FIX: 3. Add ALL community members to this channel
-            members_added = 0
-            for cm in community_members:
-                try:
-                    # Community admins/owners become channel admins
-                    channel_role = 'admin' if cm['role'] in ['admin', 'owner'] else 'member'
-                    
-                    cur.execute("""
-                        INSERT INTO channel_members (channel_id, user_id, role)
-                        VALUES (%s, %s, %s)
-                    """, (channel_id, cm['user_id'], channel_role))
-                    members_added += 1
-                except Exception as mem_err:
-                    print(f"[WARNING] Failed to add member {cm['user_id']} to channel: {mem_err}")
-
-            print(f"[INFO] ✅ Added {members_added} members to channel {channel_id}")
+            log.info("[CHANNELS] Added %s members to channel %s", members_added, channel_id)
 
         conn.commit()
-        print(f"[SUCCESS] Channel '{name}' created with {members_added} members")
+        invalidate_community(community_id)  # channel_count
+        log.info("[CHANNELS] Channel '%s' created with %s members", name, members_added)
         
         return jsonify({
             'id': channel_id,
@@ -235,9 +264,7 @@ def create_channel(community_id):
         }), 201
 
     except Exception as e:
-        print(f"[ERROR] create_channel: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] create_channel: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to create channel'}), 500
@@ -252,40 +279,44 @@ def create_channel(community_id):
 def join_channel(channel_id):
     conn = None
     try:
-        username = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
-
-            cur.execute("SELECT community_id FROM channels WHERE id = %s", (channel_id,))
-            channel = cur.fetchone()
-            if not channel:
-                return jsonify({'error': 'Channel not found'}), 404
-
-            cur.execute("SELECT 1 FROM community_members WHERE community_id = %s AND user_id = %s",
-                        (channel['community_id'], user_id))
-            if not cur.fetchone():
-                return jsonify({'error': 'Must be community member'}), 403
-
-            cur.execute("SELECT 1 FROM channel_members WHERE channel_id = %s AND user_id = %s",
-                        (channel_id, user_id))
-            if cur.fetchone():
-                return jsonify({'message': 'Already joined'}), 200
 
+            # Insert only if the channel exists and the caller is in its
+            # community; the unique key turns "already joined" into a no-op
             cur.execute("""
-                INSERT INTO channel_members (channel_id, user_id, role)
-                VALUES (%s, %s, 'member')
-            """, (channel_id, user_id))
+                INSERT IGNORE INTO channel_members (channel_id, user_id, role)
+                SELECT ch.id, cm.user_id, 'member'
+                FROM channels ch
+                JOIN community_members cm
+                  ON cm.community_id = ch.community_id AND cm.user_id = %s
+                WHERE ch.id = %s
+            """, (user_id, channel_id))
+
+            if not cur.rowcount:
+                # Nothing inserted — find out why (rare path)
+                cur.execute("""
+                    SELECT cm.user_id IS NOT NULL AS is_community_member
+                    FROM channels ch
+                    LEFT JOIN community_members cm
+                           ON cm.community_id = ch.community_id AND cm.user_id = %s
+                    WHERE ch.id = %s
+                """, (user_id, channel_id))
+                channel = cur.fetchone()
+                if not channel:
+                    return jsonify({'error': 'Channel not found'}), 404
+                if not channel['is_community_member']:
+                    return jsonify({'error': 'Must be community member'}), 403
+                return jsonify({'message': 'Already joined'}), 200
 
         conn.commit()
         return jsonify({'message': 'Joined channel'}), 200
 
     except Exception as e:
-        print(f"[ERROR] join_channel: {e}")
+        log.exception("[CHANNELS] join_channel: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to join channel'}), 500
@@ -301,14 +332,11 @@ def join_channel(channel_id):
 def leave_channel(channel_id):
     conn = None
     try:
-        username = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
             cur.execute("""
                 DELETE FROM channel_members 
@@ -322,7 +350,7 @@ def leave_channel(channel_id):
         return jsonify({'message': 'Left channel'}), 200
 
     except Exception as e:
-        print(f"[ERROR] leave_channel: {e}")
+        log.exception("[CHANNELS] leave_channel: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to leave channel'}), 500
@@ -338,46 +366,58 @@ def leave_channel(channel_id):
 def get_friends():
     conn = None
     try:
-        username = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
+        # Tuple rows: the response dict below is the only per-row dict built
+        with conn.cursor(Cursor) as cur:
+            # One branch per friendship direction so each side uses its own
+            # index (unique_friendship (user_id, friend_id) /
+            # idx_friends_friend_user (friend_id, user_id)); UNION dedupes
             cur.execute("""
-                SELECT DISTINCT u.id, u.username, u.display_name, u.avatar_url, 
-                       u.status, u.custom_status, u.last_seen
+                SELECT u.id, u.username,
+                       COALESCE(NULLIF(u.display_name, ''), u.username) AS display_name,
+                       u.avatar_url,
+                       COALESCE(NULLIF(u.status, ''), 'offline') AS status,
+                       u.custom_status, u.last_seen,
+                       (u.status = 'online') AS is_online
                 FROM friends f
-                JOIN users u ON u.id = (CASE WHEN f.user_id = %s THEN f.friend_id ELSE f.user_id END)
-                WHERE f.user_id = %s OR f.friend_id = %s
-            """, (user_id, user_id, user_id))
+                JOIN users u ON u.id = f.friend_id
+                WHERE f.user_id = %s
+                UNION
+                SELECT u.id, u.username,
+                       COALESCE(NULLIF(u.display_name, ''), u.username) AS display_name,
+                       u.avatar_url,
+                       COALESCE(NULLIF(u.status, ''), 'offline') AS status,
+                       u.custom_status, u.last_seen,
+                       (u.status = 'online') AS is_online
+                FROM friends f
+                JOIN users u ON u.id = f.user_id
+                WHERE f.friend_id = %s
+                ORDER BY is_online DESC, display_name ASC
+            """, (user_id, user_id))
             friends = cur.fetchall()
 
-        def format_friend(f):
-            username = f['username']
-            return {
-                'id': f['id'],
-                'username': username,
-                'display_name': f['display_name'] or username,
-                'avatar_url': f['avatar_url'] or 
-                             f"https://api.dicebear.com/7.x/avataaars/svg?seed={username}",
-                'status': f['status'] or 'offline',
-                'custom_status': f['custom_status'],
-                'last_seen': f['last_seen'].isoformat() if f['last_seen'] else None
-            }
-
-        result = sorted(
-            [format_friend(f) for f in friends],
-            key=lambda x: (x['status'] != 'online', x['display_name'].lower())
-        )
+        # Online first, then by name — ordered in SQL (case-insensitive collation);
+        # display_name/status fallbacks are applied there too
+        result = [{
+            'id': fid,
+            'username': fname,
+            'display_name': display_name,
+            'avatar_url': get_avatar_url(fname, avatar_url),
+            'status': status,
+            'custom_status': custom_status,
+            'last_seen': last_seen.isoformat() if last_seen else None
+        } for (fid, fname, display_name, avatar_url, status, custom_status,
+               last_seen, _is_online) in friends]
 
         return jsonify(result), 200
 
     except Exception as e:
-        print(f"[ERROR] get_friends: {e}")
+        log.exception("[CHANNELS] get_friends: %s", e)
         return jsonify({'error': 'Failed to fetch friends'}), 500
     finally:
         if conn:
@@ -404,26 +444,23 @@ def create_community():
         conn = get_db_connection()
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
+            # All four inserts share one transaction (single COMMIT / redo flush)
             # 1. Create community
             cur.execute("""
                 INSERT INTO communities (name, description, icon, color, created_by)
                 VALUES (%s, %s, %s, %s, %s)
             """, (name, description, icon, color, user_id))
             community_id = cur.lastrowid
-            print(f"[INFO] Created community {community_id}: {name}")
 
             # 2. Add creator as owner in community_members
             cur.execute("""
                 INSERT INTO community_members (community_id, user_id, role)
                 VALUES (%s, %s, 'owner')
             """, (community_id, user_id))
-            print(f"[INFO] Added user {user_id} as owner of community {community_id}")
 
             # 3. Create default "general" channel
             cur.execute("""
@@ -431,17 +468,18 @@ def create_community():
                 VALUES (%s, 'general', 'text', 'General chat', %s)
             """, (community_id, user_id))
             general_channel_id = cur.lastrowid
-            print(f"[INFO] Created general channel {general_channel_id}")
 
             # 🔥 FIX: Add creator to the general channel as member
             cur.execute("""
                 INSERT INTO channel_members (channel_id, user_id, role)
                 VALUES (%s, %s, 'admin')
             """, (general_channel_id, user_id))
-            print(f"[INFO] ✅ Added user {user_id} to channel_members for channel {general_channel_id}")
 
         conn.commit()
-        print(f"[SUCCESS] Community creation complete for {name}")
+        invalidate_profile(username)  # may now be an owner → /api/me role changes
+        invalidate_community(community_id)  # creator's community list
+        log.info("[CHANNELS] Created community %s (%s) with general channel %s, owner %s",
+                 community_id, name, general_channel_id, user_id)
         
         return jsonify({
             'id': community_id,
@@ -453,9 +491,7 @@ def create_community():
         }), 201
 
     except Exception as e:
-        print(f"[ERROR] create_community: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] create_community: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to create community'}), 500
@@ -471,35 +507,34 @@ def create_community():
 def delete_channel(channel_id):
     conn = None
     try:
-        username = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
-            cur.execute("SELECT community_id FROM channels WHERE id = %s", (channel_id,))
+            # Channel lookup and the caller's community role in one query
+            cur.execute("""
+                SELECT ch.community_id, cm.role
+                FROM channels ch
+                LEFT JOIN community_members cm
+                       ON cm.community_id = ch.community_id AND cm.user_id = %s
+                WHERE ch.id = %s
+            """, (user_id, channel_id))
             channel = cur.fetchone()
             if not channel:
                 return jsonify({'error': 'Channel not found'}), 404
-
-            cur.execute("""
-                SELECT role FROM community_members
-                WHERE community_id = %s AND user_id = %s
-            """, (channel['community_id'], user_id))
-            member = cur.fetchone()
-            if not member or member['role'] not in ['admin', 'owner']:
+            if channel['role'] not in ['admin', 'owner']:
                 return jsonify({'error': 'Permission denied'}), 403
 
             cur.execute("DELETE FROM channels WHERE id = %s", (channel_id,))
 
         conn.commit()
+        invalidate_community(channel['community_id'])  # channel_count
         return jsonify({'message': 'Channel deleted'}), 200
 
     except Exception as e:
-        print(f"[ERROR] delete_channel: {e}")
+        log.exception("[CHANNELS] delete_channel: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to delete channel'}), 500
@@ -515,63 +550,46 @@ def delete_channel(channel_id):
 def update_community(community_id):
     conn = None
     try:
-        username = get_jwt_identity()
         data = request.get_json() or {}
-        
+
+        # Requested changes (an empty name is ignored, as before)
+        changes = {col: data[col] for col in _COMMUNITY_COLUMNS
+                   if col in data and (col != 'name' or data[col])}
+        if not changes:
+            return jsonify({'error': 'No fields to update'}), 400
+        mask = sum(1 << i for i, col in enumerate(_COMMUNITY_COLUMNS) if col in changes)
+
         conn = get_db_connection()
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
-            
-            # Check permissions (only owner/admin can update)
-            cur.execute("""
-                SELECT role FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (community_id, user_id))
-            member = cur.fetchone()
-            if not member or member['role'] not in ['admin', 'owner']:
-                return jsonify({'error': 'Permission denied'}), 403
-            
-            # Build update query dynamically
-            updates = []
-            values = []
             
-            if 'name' in data and data['name']:
-                updates.append("name = %s")
-                values.append(data['name'])
-            if 'description' in data:
-                updates.append("description = %s")
-                values.append(data['description'])
-            if 'icon' in data:
-                updates.append("icon = %s")
-                values.append(data['icon'])
-            if 'color' in data:
-                updates.append("color = %s")
-                values.append(data['color'])
-            
-            if not updates:
-                return jsonify({'error': 'No fields to update'}), 400
-            
-            values.append(community_id)
-            cur.execute(f"""
-                UPDATE communities SET {', '.join(updates)}
-                WHERE id = %s
-            """, tuple(values))
-            
-            # Fetch updated community
+            # Community row and the caller's role in one query
             cur.execute("""
-                SELECT c.id, c.name, c.description, c.icon, c.color, 
-                       c.logo_url, c.banner_url, c.created_at
+                SELECT c.id, c.name, c.description, c.icon, c.color,
+                       c.logo_url, c.banner_url, c.created_at, cm.role
                 FROM communities c
+                LEFT JOIN community_members cm
+                       ON cm.community_id = c.id AND cm.user_id = %s
                 WHERE c.id = %s
-            """, (community_id,))
+            """, (user_id, community_id))
             community = cur.fetchone()
-        
+
+            # Check permissions (only owner/admin can update)
+            if not community or community['role'] not in ['admin', 'owner']:
+                return jsonify({'error': 'Permission denied'}), 403
+
+            cur.execute(
+                _COMMUNITY_UPDATE_SQL[mask],
+                [changes[col] for col in _COMMUNITY_COLUMNS if col in changes] + [community_id],
+            )
+
         conn.commit()
+        invalidate_community(community_id)
+        # Updated community = the row read above with the new values applied
+        community.update(changes)
         
         return jsonify({
             'id': community['id'],
@@ -585,9 +603,7 @@ def update_community(community_id):
         }), 200
         
     except Exception as e:
-        print(f"[ERROR] update_community: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] update_community: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to update community'}), 500
@@ -603,65 +619,58 @@ def update_community(community_id):
 def get_community(community_id):
     conn = None
     try:
-        username = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
             
-            # Check membership
-            cur.execute("""
-                SELECT cm.role FROM community_members cm
-                WHERE cm.community_id = %s AND cm.user_id = %s
-            """, (community_id, user_id))
+            # Membership (and role) is checked on every request; only the
+            # viewer-independent details below are cached
+            cur.execute(_MEMBER_ROLE_SQL, (community_id, user_id))
             membership = cur.fetchone()
             if not membership:
                 return jsonify({'error': 'Access denied'}), 403
-            
-            # Fetch community details
-            cur.execute("""
-                SELECT c.id, c.name, c.description, c.icon, c.color, 
-                       c.logo_url, c.banner_url, c.created_at, c.created_by,
-                       u.username as creator_username, u.display_name as creator_display_name
-                FROM communities c
-                LEFT JOIN users u ON c.created_by = u.id
-                WHERE c.id = %s
-            """, (community_id,))
-            community = cur.fetchone()
-            
-            if not community:
-                return jsonify({'error': 'Community not found'}), 404
-            
-            # Get member count
-            cur.execute("""
-                SELECT COUNT(*) as count FROM community_members 
-                WHERE community_id = %s
-            """, (community_id,))
-            member_count = cur.fetchone()['count']
-        
-        return jsonify({
-            'id': community['id'],
-            'name': community['name'],
-            'description': community['description'],
-            'icon': community['icon'],
-            'color': community['color'],
-            'logo_url': community['logo_url'],
-            'banner_url': community['banner_url'],
-            'created_at': community['created_at'].isoformat() if community['created_at'] else None,
-            'role': membership['role'],
-            'member_count': member_count,
-            'creator': {
-                'username': community['creator_username'],
-                'display_name': community['creator_display_name']
-            } if community['creator_username'] else None
-        }), 200
+
+            details = get_details(community_id)
+            if details is None:
+                cur.execute("""
+                    SELECT c.id, c.name, c.description, c.icon, c.color,
+                           c.logo_url, c.banner_url, c.created_at, c.created_by,
+                           u.username as creator_username, u.display_name as creator_display_name,
+                           (SELECT COUNT(*) FROM community_members m
+                            WHERE m.community_id = c.id) as member_count
+                    FROM communities c
+                    LEFT JOIN users u ON c.created_by = u.id
+                    WHERE c.id = %s
+                """, (community_id,))
+                community = cur.fetchone()
+
+                if not community:
+                    return jsonify({'error': 'Community not found'}), 404
+
+                details = {
+                    'id': community['id'],
+                    'name': community['name'],
+                    'description': community['description'],
+                    'icon': community['icon'],
+                    'color': community['color'],
+                    'logo_url': community['logo_url'],
+                    'banner_url': community['banner_url'],
+                    'created_at': community['created_at'].isoformat() if community['created_at'] else None,
+                    'member_count': community['member_count'],
+                    'creator': {
+                        'username': community['creator_username'],
+                        'display_name': community['creator_display_name']
+                    } if community['creator_username'] else None
+                }
+                set_details(community_id, details)
+
+        return jsonify({**details, 'role': membership['role']}), 200
         
     except Exception as e:
-        print(f"[ERROR] get_community: {e}")
+        log.exception("[CHANNELS] get_community: %s", e)
         return jsonify({'error': 'Failed to fetch community'}), 500
     finally:
         if conn:
@@ -674,8 +683,9 @@ def get_community(community_id):
 @jwt_required()
 def upload_community_logo(community_id):
     conn = None
+    filepath = None
+    saved = False
     try:
-        username = get_jwt_identity()
         
         # Check if file is present
         if 'logo' not in request.files:
@@ -698,21 +708,39 @@ def upload_community_logo(community_id):
         conn = get_db_connection()
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
             
             # Check permissions (only owner/admin can upload)
-            cur.execute("""
-                SELECT role FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (community_id, user_id))
+            cur.execute(_MEMBER_ROLE_SQL, (community_id, user_id))
             member = cur.fetchone()
             if not member or member['role'] not in ['admin', 'owner']:
                 return jsonify({'error': 'Permission denied'}), 403
-            
+        
+        # Authorized: release the connection while the image is rendered —
+        # only the UPDATE below needs one again
+        conn.close()
+        conn = None
+        
+        # Process and save image
+        processed = process_image(file, LOGO_SIZE)
+        if not processed:
+            return jsonify({'error': 'Failed to process image'}), 500
+        
+        # Generate unique filename
+        filename = f"logo_{community_id}_{uuid.uuid4().hex[:8]}.jpg"
+        filepath = os.path.join(UPLOAD_FOLDER, filename)
+        
+        log.debug("[CHANNELS] Saving logo to: %s", filepath)
+        
+        with open(filepath, 'wb') as f:
+            f.write(processed.read())
+        
+        log.debug("[CHANNELS] Logo file saved successfully")
+        
+        conn = get_db_connection()
+        with conn.cursor() as cur:
             # Get existing logo to delete
             cur.execute("SELECT logo_url FROM communities WHERE id = %s", (community_id,))
             community = cur.fetchone()
@@ -721,42 +749,28 @@ def upload_community_logo(community_id):
             
             old_logo = community['logo_url']
             
-            # Process and save image
-            processed = process_image(file, LOGO_SIZE)
-            if not processed:
-                return jsonify({'error': 'Failed to process image'}), 500
-            
-            # Generate unique filename
-            filename = f"logo_{community_id}_{uuid.uuid4().hex[:8]}.jpg"
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            
-            print(f"[DEBUG] Saving logo to: {filepath}")
-            
-            with open(filepath, 'wb') as f:
-                f.write(processed.read())
-            
-            print(f"[DEBUG] Logo file saved successfully")
-            
             # Update database
             logo_url = f"/uploads/communities/{filename}"
             cur.execute("""
                 UPDATE communities SET logo_url = %s WHERE id = %s
             """, (logo_url, community_id))
             
-            print(f"[DEBUG] Database updated with logo_url: {logo_url}")
-            
-            # Delete old logo file if exists
-            if old_logo:
-                old_path = os.path.join(UPLOAD_FOLDER, os.path.basename(old_logo))
-                if os.path.exists(old_path):
-                    try:
-                        os.remove(old_path)
-                        print(f"[DEBUG] Deleted old logo: {old_path}")
-                    except Exception as e:
-                        print(f"[WARNING] Failed to delete old logo: {e}")
+            log.debug("[CHANNELS] Database updated with logo_url: %s", logo_url)
         
         conn.commit()
-        print(f"[SUCCESS] Logo uploaded for community {community_id}")
+        saved = True
+        invalidate_community(community_id)
+        
+        # Delete old logo file if exists
+        if old_logo:
+            old_path = os.path.join(UPLOAD_FOLDER, os.path.basename(old_logo))
+            if os.path.exists(old_path):
+                try:
+                    os.remove(old_path)
+                    log.debug("[CHANNELS] Deleted old logo: %s", old_path)
+                except Exception as e:
+                    log.warning("[CHANNELS] Failed to delete old logo: %s", e)
+        log.info("[CHANNELS] Logo uploaded for community %s", community_id)
         
         return jsonify({
             'message': 'Logo uploaded successfully',
@@ -764,15 +778,19 @@ def upload_community_logo(community_id):
         }), 200
         
     except Exception as e:
-        print(f"[ERROR] upload_community_logo: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] upload_community_logo: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to upload logo'}), 500
     finally:
         if conn:
             conn.close()
+        # Rejected or failed upload: don't leave the rendered file behind
+        if filepath and not saved:
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
 
 
 # =====================================
@@ -781,8 +799,9 @@ def upload_community_logo(community_id):
 @jwt_required()
 def upload_community_banner(community_id):
     conn = None
+    filepath = None
+    saved = False
     try:
-        username = get_jwt_identity()
         
         # Check if file is present
         if 'banner' not in request.files:
@@ -805,21 +824,39 @@ def upload_community_banner(community_id):
         conn = get_db_connection()
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
             
             # Check permissions (only owner/admin can upload)
-            cur.execute("""
-                SELECT role FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (community_id, user_id))
+            cur.execute(_MEMBER_ROLE_SQL, (community_id, user_id))
             member = cur.fetchone()
             if not member or member['role'] not in ['admin', 'owner']:
                 return jsonify({'error': 'Permission denied'}), 403
-            
+        
+        # Authorized: release the connection while the image is rendered —
+        # only the UPDATE below needs one again
+        conn.close()
+        conn = None
+        
+        # Process and save image
+        processed = process_image(file, BANNER_SIZE, maintain_aspect=False)
+        if not processed:
+            return jsonify({'error': 'Failed to process image'}), 500
+        
+        # Generate unique filename
+        filename = f"banner_{community_id}_{uuid.uuid4().hex[:8]}.jpg"
+        filepath = os.path.join(UPLOAD_FOLDER, filename)
+        
+        log.debug("[CHANNELS] Saving banner to: %s", filepath)
+        
+        with open(filepath, 'wb') as f:
+            f.write(processed.read())
+        
+        log.debug("[CHANNELS] Banner file saved successfully")
+        
+        conn = get_db_connection()
+        with conn.cursor() as cur:
             # Get existing banner to delete
             cur.execute("SELECT banner_url FROM communities WHERE id = %s", (community_id,))
             community = cur.fetchone()
@@ -828,42 +865,28 @@ def upload_community_banner(community_id):
             
             old_banner = community['banner_url']
             
-            # Process and save image
-            processed = process_image(file, BANNER_SIZE, maintain_aspect=False)
-            if not processed:
-                return jsonify({'error': 'Failed to process image'}), 500
-            
-            # Generate unique filename
-            filename = f"banner_{community_id}_{uuid.uuid4().hex[:8]}.jpg"
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            
-            print(f"[DEBUG] Saving banner to: {filepath}")
-            
-            with open(filepath, 'wb') as f:
-                f.write(processed.read())
-            
-            print(f"[DEBUG] Banner file saved successfully")
-            
             # Update database
             banner_url = f"/uploads/communities/{filename}"
             cur.execute("""
                 UPDATE communities SET banner_url = %s WHERE id = %s
             """, (banner_url, community_id))
             
-            print(f"[DEBUG] Database updated with banner_url: {banner_url}")
-            
-            # Delete old banner file if exists
-            if old_banner:
-                old_path = os.path.join(UPLOAD_FOLDER, os.path.basename(old_banner))
-                if os.path.exists(old_path):
-                    try:
-                        os.remove(old_path)
-                        print(f"[DEBUG] Deleted old banner: {old_path}")
-                    except Exception as e:
-                        print(f"[WARNING] Failed to delete old banner: {e}")
+            log.debug("[CHANNELS] Database updated with banner_url: %s", banner_url)
         
         conn.commit()
-        print(f"[SUCCESS] Banner uploaded for community {community_id}")
+        saved = True
+        invalidate_community(community_id)
+        
+        # Delete old banner file if exists
+        if old_banner:
+            old_path = os.path.join(UPLOAD_FOLDER, os.path.basename(old_banner))
+            if os.path.exists(old_path):
+                try:
+                    os.remove(old_path)
+                    log.debug("[CHANNELS] Deleted old banner: %s", old_path)
+                except Exception as e:
+                    log.warning("[CHANNELS] Failed to delete old banner: %s", e)
+        log.info("[CHANNELS] Banner uploaded for community %s", community_id)
         
         return jsonify({
             'message': 'Banner uploaded successfully',
@@ -871,15 +894,19 @@ def upload_community_banner(community_id):
         }), 200
         
     except Exception as e:
-        print(f"[ERROR] upload_community_banner: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] upload_community_banner: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to upload banner'}), 500
     finally:
         if conn:
             conn.close()
+        # Rejected or failed upload: don't leave the rendered file behind
+        if filepath and not saved:
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
 
 
 # =====================================
@@ -889,22 +916,16 @@ def upload_community_banner(community_id):
 def remove_community_logo(community_id):
     conn = None
     try:
-        username = get_jwt_identity()
         
         conn = get_db_connection()
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
             
             # Check permissions (only owner/admin can remove)
-            cur.execute("""
-                SELECT role FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (community_id, user_id))
+            cur.execute(_MEMBER_ROLE_SQL, (community_id, user_id))
             member = cur.fetchone()
             if not member or member['role'] not in ['admin', 'owner']:
                 return jsonify({'error': 'Permission denied'}), 403
@@ -928,17 +949,18 @@ def remove_community_logo(community_id):
                 if os.path.exists(old_path):
                     try:
                         os.remove(old_path)
-                        print(f"[DEBUG] Deleted logo file: {old_path}")
+                        log.debug("[CHANNELS] Deleted logo file: %s", old_path)
                     except Exception as e:
-                        print(f"[WARNING] Failed to delete logo file: {e}")
+                        log.warning("[CHANNELS] Failed to delete logo file: %s", e)
         
         conn.commit()
-        print(f"[SUCCESS] Logo removed for community {community_id}")
+        invalidate_community(community_id)
+        log.info("[CHANNELS] Logo removed for community %s", community_id)
         
         return jsonify({'message': 'Logo removed successfully'}), 200
         
     except Exception as e:
-        print(f"[ERROR] remove_community_logo: {e}")
+        log.exception("[CHANNELS] remove_community_logo: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to remove logo'}), 500
@@ -954,22 +976,16 @@ def remove_community_logo(community_id):
 def remove_community_banner(community_id):
     conn = None
     try:
-        username = get_jwt_identity()
         
         conn = get_db_connection()
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
             
             # Check permissions (only owner/admin can remove)
-            cur.execute("""
-                SELECT role FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (community_id, user_id))
+            cur.execute(_MEMBER_ROLE_SQL, (community_id, user_id))
             member = cur.fetchone()
             if not member or member['role'] not in ['admin', 'owner']:
                 return jsonify({'error': 'Permission denied'}), 403
@@ -993,17 +1009,18 @@ def remove_community_banner(community_id):
                 if os.path.exists(old_path):
                     try:
                         os.remove(old_path)
-                        print(f"[DEBUG] Deleted banner file: {old_path}")
+                        log.debug("[CHANNELS] Deleted banner file: %s", old_path)
                     except Exception as e:
-                        print(f"[WARNING] Failed to delete banner file: {e}")
+                        log.warning("[CHANNELS] Failed to delete banner file: %s", e)
         
         conn.commit()
-        print(f"[SUCCESS] Banner removed for community {community_id}")
+        invalidate_community(community_id)
+        log.info("[CHANNELS] Banner removed for community %s", community_id)
         
         return jsonify({'message': 'Banner removed successfully'}), 200
         
     except Exception as e:
-        print(f"[ERROR] remove_community_banner: {e}")
+        log.exception("[CHANNELS] remove_community_banner: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to remove banner'}), 500
@@ -1018,7 +1035,7 @@ def remove_community_banner(community_id):
 @jwt_required()
 def search_users():
     """
-    Search users by username (fuzzy match) or email (exact match).
+    Search users by username (prefix match) or email (exact match).
     Used for finding users to invite to communities.
     
     Query params:
@@ -1035,34 +1052,36 @@ def search_users():
         if not query or len(query) < 2:
             return jsonify([]), 200
 
-        username = get_jwt_identity()
         conn = get_db_connection()
         
         with conn.cursor() as cur:
             # Get current user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            current_user_id = jwt_user_id(cur)
+            if not current_user_id:
                 return jsonify({'error': 'User not found'}), 404
-            current_user_id = user_row['id']
 
-            # Search by username (fuzzy) or email (exact)
-            search_pattern = f"%{query}%"
+            # Search by username (prefix) or email (exact). One UNION arm per
+            # UNIQUE key (range on username, eq on email) instead of an OR;
+            # a leading wildcard would scan the whole users table on every
+            # keystroke. The email arm skips rows the prefix arm already has.
+            prefix = _escape_like(query) + '%'
             cur.execute("""
                 SELECT id, username, email, display_name, avatar_url
-                FROM users
-                WHERE (username LIKE %s OR email = %s)
-                  AND id != %s
-                ORDER BY 
-                    CASE 
-                        WHEN username = %s THEN 1
-                        WHEN username LIKE %s THEN 2
-                        WHEN email = %s THEN 3
-                        ELSE 4
-                    END,
-                    username ASC
+                FROM (
+                    (SELECT id, username, email, display_name, avatar_url,
+                            CASE WHEN username = %s THEN 1 ELSE 2 END AS match_rank
+                     FROM users
+                     WHERE username LIKE %s AND id != %s
+                     ORDER BY username
+                     LIMIT 20)
+                    UNION ALL
+                    (SELECT id, username, email, display_name, avatar_url, 3
+                     FROM users
+                     WHERE email = %s AND id != %s AND username NOT LIKE %s)
+                ) matches
+                ORDER BY match_rank, username
                 LIMIT 20
-            """, (search_pattern, query, current_user_id, query, f"{query}%", query))
+            """, (query, prefix, current_user_id, query, current_user_id, prefix))
             users = cur.fetchall()
 
         # Format results
@@ -1071,16 +1090,14 @@ def search_users():
             'username': u['username'],
             'email': u['email'],
             'display_name': u['display_name'] or u['username'],
-            'avatar_url': u['avatar_url'] or f"https://api.dicebear.com/7.x/avataaars/svg?seed={u['username']}"
+            'avatar_url': get_avatar_url(u['username'], u['avatar_url'])
         } for u in users]
 
-        print(f"[INFO] search_users: Found {len(result)} users for query '{query}'")
+        log.debug("[CHANNELS] search_users: Found %s users for query '%s'", len(result), query)
         return jsonify(result), 200
 
     except Exception as e:
-        print(f"[ERROR] search_users: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] search_users: %s", e)
         return jsonify({'error': 'Search failed'}), 500
     finally:
         if conn:
@@ -1109,27 +1126,25 @@ def get_community_members():
         if not community_id:
             return jsonify({'error': 'Community ID is required'}), 400
 
-        username = get_jwt_identity()
         conn = get_db_connection()
         
         with conn.cursor() as cur:
             # Get current user
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
             # Check if user is a member of the community
-            cur.execute("""
-                SELECT role FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (community_id, user_id))
+            cur.execute(_MEMBER_ROLE_SQL, (community_id, user_id))
             membership = cur.fetchone()
             
             if not membership:
                 return jsonify({'error': "You don't have permission to view members"}), 403
 
+            members = get_members(community_id)
+            if members is not None:
+                return jsonify(members_for_viewer(members, membership['role'])), 200
+
             # Get all community members
             cur.execute("""
                 SELECT 
@@ -1148,28 +1163,27 @@ def get_community_members():
                     END,
                     u.username ASC
             """, (community_id,))
-            members = cur.fetchall()
+            rows = cur.fetchall()
 
-        # Format results
-        result = [{
+        # Format results (owner's view; masked per viewer below)
+        members = [{
             'id': m['id'],
             'username': m['username'],
             'email': m['email'],
             'display_name': m['display_name'] or m['username'],
-            'avatar_url': m['avatar_url'] or f"https://api.dicebear.com/7.x/avataaars/svg?seed={m['username']}",
+            'avatar_url': get_avatar_url(m['username'], m['avatar_url']),
             'role': m['role'],
             'joined_at': m['joined_at'].isoformat() if m['joined_at'] else None,
-            'violation_count': m['violation_count'] if membership['role'] == 'owner' else None,
+            'violation_count': m['violation_count'],
             'is_blocked': bool(m['is_blocked'])
-        } for m in members]
+        } for m in rows]
+        set_members(community_id, members)
 
-        print(f"[INFO] get_community_members: Found {len(result)} members for community {community_id}")
-        return jsonify(result), 200
+        log.debug("[CHANNELS] get_community_members: Found %s members for community %s", len(members), community_id)
+        return jsonify(members_for_viewer(members, membership['role'])), 200
 
     except Exception as e:
-        print(f"[ERROR] get_community_members: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] get_community_members: %s", e)
         return jsonify({'error': 'Failed to load members'}), 500
     finally:
         if conn:
@@ -1194,7 +1208,6 @@ def add_community_member():
     """
     conn = None
     try:
-        username = get_jwt_identity()
         data = request.get_json() or {}
         
         community_id = data.get('communityId')
@@ -1208,74 +1221,46 @@ def add_community_member():
         
         with conn.cursor() as cur:
             # Get current user
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            current_user_id = jwt_user_id(cur)
+            if not current_user_id:
                 return jsonify({'error': 'User not found'}), 404
-            current_user_id = user_row['id']
 
             # Check if current user has permission (admin or owner)
-            cur.execute("""
-                SELECT role FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (community_id, current_user_id))
+            cur.execute(_MEMBER_ROLE_SQL, (community_id, current_user_id))
             membership = cur.fetchone()
             
             if not membership or membership['role'] not in ['admin', 'owner']:
                 return jsonify({'error': "You don't have permission to add members"}), 403
 
-            # Check if user to add exists
-            cur.execute("SELECT id, username FROM users WHERE id = %s", (user_id_to_add,))
+            # Target user, community block and existing membership in one probe
+            cur.execute("""
+                SELECT u.id, u.username,
+                       EXISTS(SELECT 1 FROM blocked_users bu
+                              WHERE bu.community_id = %s AND bu.user_id = u.id) AS is_blocked,
+                       EXISTS(SELECT 1 FROM community_members cm
+                              WHERE cm.community_id = %s AND cm.user_id = u.id) AS is_member
+                FROM users u
+                WHERE u.id = %s
+            """, (community_id, community_id, user_id_to_add))
             target_user = cur.fetchone()
             if not target_user:
                 return jsonify({'error': 'User not found'}), 404
-
-            # Respect community blocks
-            cur.execute(
-                "SELECT 1 FROM blocked_users WHERE community_id = %s AND user_id = %s",
-                (community_id, user_id_to_add)
-            )
-            if cur.fetchone():
+            if target_user['is_blocked']:
                 return jsonify({'error': 'User is blocked from this community'}), 403
-
-            # Check if user is already a member
-            cur.execute("""
-                SELECT 1 FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (community_id, user_id_to_add))
-            
-            if cur.fetchone():
+            if target_user['is_member']:
                 return jsonify({'error': 'User is already a member'}), 409
 
             # 1. Add user to community_members
-            cur.execute("""
-                INSERT INTO community_members (community_id, user_id, role)
-                VALUES (%s, %s, 'member')
-            """, (community_id, user_id_to_add))
-            print(f"[INFO] Added user {user_id_to_add} to community {community_id}")
-
-            # 🔥 FIX: 2. Get all channels in this community
-            cur.execute("""
-                SELECT id, name FROM channels 
-                WHERE community_id = %s
-            """, (community_id,))
-            channels = cur.fetchall()
+            cur.execute(_ADD_COMMUNITY_MEMBER_SQL, (community_id, user_id_to_add))
+            log.info("[CHANNELS] Added user %s to community %s", user_id_to_add, community_id)
 
-            # 🔥 FIX: 3. Add user to ALL channels in the community
-            channels_added = 0
-            for channel in channels:
-                try:
-                    cur.execute("""
-                        INSERT INTO channel_members (channel_id, user_id, role)
-                        VALUES (%s, %s, 'member')
-                    """, (channel['id'], user_id_to_add))
-                    channels_added += 1
-                    print(f"[INFO] ✅ Added user {user_id_to_add} to channel {channel['id']} ({channel['name']})")
-                except Exception as ch_err:
-                    print(f"[WARNING] Failed to add to channel {channel['id']}: {ch_err}")
+            # 🔥 FIX: 2. Add user to ALL channels in the community
+            cur.execute(_ADD_TO_ALL_CHANNELS_SQL, (user_id_to_add, community_id))
+            channels_added = cur.rowcount
 
         conn.commit()
-        print(f"[SUCCESS] User {target_user['username']} added to community {community_id} and {channels_added} channels")
+        invalidate_community(community_id)
+        log.info("[CHANNELS] User %s added to community %s and %s channels", target_user['username'], community_id, channels_added)
         
         return jsonify({
             'message': 'Member added successfully',
@@ -1283,9 +1268,7 @@ def add_community_member():
         }), 201
 
     except Exception as e:
-        print(f"[ERROR] add_community_member: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] add_community_member: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to add member'}), 500
@@ -1312,7 +1295,6 @@ def update_channel(channel_id):
     """
     conn = None
     try:
-        username = get_jwt_identity()
         data = request.get_json() or {}
         
         name = data.get('name')
@@ -1323,28 +1305,24 @@ def update_channel(channel_id):
         
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
-            # Get channel and community
+            # Channel row and the caller's community role in one query
             cur.execute("""
-                SELECT community_id FROM channels WHERE id = %s
-            """, (channel_id,))
+                SELECT ch.id, ch.name, ch.type, ch.description, ch.created_at, cm.role
+                FROM channels ch
+                LEFT JOIN community_members cm
+                       ON cm.community_id = ch.community_id AND cm.user_id = %s
+                WHERE ch.id = %s
+            """, (user_id, channel_id))
             channel = cur.fetchone()
             if not channel:
                 return jsonify({'error': 'Channel not found'}), 404
 
             # Check permissions (admin or owner of community)
-            cur.execute("""
-                SELECT role FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (channel['community_id'], user_id))
-            member = cur.fetchone()
-            
-            if not member or member['role'] not in ['admin', 'owner']:
+            if channel['role'] not in ['admin', 'owner']:
                 return jsonify({'error': 'Permission denied'}), 403
 
             # Build update query
@@ -1372,30 +1350,21 @@ def update_channel(channel_id):
             cur.execute(query, update_values)
 
         conn.commit()
-        
-        # Fetch and return updated channel
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT id, name, type, description, created_at
-                FROM channels WHERE id = %s
-            """, (channel_id,))
-            updated = cur.fetchone()
 
+        # Updated channel = the row read above with the new values applied
         result = {
-            'id': updated['id'],
-            'name': updated['name'],
-            'type': updated['type'],
-            'description': updated['description'],
-            'created_at': updated['created_at'].isoformat() if updated['created_at'] else None
+            'id': channel['id'],
+            'name': name if name is not None else channel['name'],
+            'type': channel_type if channel_type is not None else channel['type'],
+            'description': description if description is not None else channel['description'],
+            'created_at': channel['created_at'].isoformat() if channel['created_at'] else None
         }
 
-        print(f"[SUCCESS] Channel {channel_id} updated")
+        log.info("[CHANNELS] Channel %s updated", channel_id)
         return jsonify(result), 200
 
     except Exception as e:
-        print(f"[ERROR] update_channel: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] update_channel: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to update channel'}), 500
@@ -1423,42 +1392,25 @@ def delete_community(community_id):
         
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
             # Check if user is owner
-            cur.execute("""
-                SELECT role FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (community_id, user_id))
+            cur.execute(_MEMBER_ROLE_SQL, (community_id, user_id))
             member = cur.fetchone()
             
             if not member or member['role'] != 'owner':
                 return jsonify({'error': 'Only the owner can delete the community'}), 403
 
-            # Get all channels in community
-            cur.execute("SELECT id FROM channels WHERE community_id = %s", (community_id,))
-            channels = cur.fetchall()
-
-            # Delete all messages in those channels
-            for channel in channels:
-                cur.execute("DELETE FROM messages WHERE channel_id = %s", (channel['id'],))
-                cur.execute("DELETE FROM channel_members WHERE channel_id = %s", (channel['id'],))
-
-            # Delete channels
-            cur.execute("DELETE FROM channels WHERE community_id = %s", (community_id,))
-
-            # Delete community members
-            cur.execute("DELETE FROM community_members WHERE community_id = %s", (community_id,))
-
-            # Delete community
+            # Delete community — channels, channel members, messages, community
+            # members and blocks go with it via ON DELETE CASCADE (see schema)
             cur.execute("DELETE FROM communities WHERE id = %s", (community_id,))
 
         conn.commit()
-        print(f"[SUCCESS] Community {community_id} deleted by {username}")
+        invalidate_community(community_id)
+        invalidate_profile(username)  # may no longer own any community
+        log.info("[CHANNELS] Community %s deleted by %s", community_id, username)
 
         # Broadcast deletion to all members via socket
         from app import socketio
@@ -1469,14 +1421,12 @@ def delete_community(community_id):
                 'deleted_by': username,
                 'timestamp': datetime.now().isoformat()
             }, namespace='/')
-            print(f"[SOCKET] Broadcasted community_deleted for community {community_id}")
+            log.info("[CHANNELS] Broadcasted community_deleted for community %s", community_id)
 
         return jsonify({'message': 'Community deleted successfully'}), 200
 
     except Exception as e:
-        print(f"[ERROR] delete_community: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] delete_community: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to delete community'}), 500
@@ -1504,17 +1454,12 @@ def leave_community(community_id):
         
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
             # Check membership
-            cur.execute("""
-                SELECT role FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (community_id, user_id))
+            cur.execute(_MEMBER_ROLE_SQL, (community_id, user_id))
             member = cur.fetchone()
             
             if not member:
@@ -1538,7 +1483,8 @@ def leave_community(community_id):
             """, (community_id, user_id))
 
         conn.commit()
-        print(f"[SUCCESS] User {user_id} ({username}) left community {community_id}")
+        invalidate_community(community_id)
+        log.info("[CHANNELS] User %s (%s) left community %s", user_id, username, community_id)
 
         # Broadcast leave event via socket to notify remaining members
         from app import socketio
@@ -1550,14 +1496,12 @@ def leave_community(community_id):
                 'username': username,
                 'timestamp': datetime.now().isoformat()
             }, namespace='/')
-            print(f"[SOCKET] Broadcasted community_left for user {username} from community {community_id}")
+            log.info("[CHANNELS] Broadcasted community_left for user %s from community %s", username, community_id)
 
         return jsonify({'message': 'You have left the community'}), 200
 
     except Exception as e:
-        print(f"[ERROR] leave_community: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] leave_community: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to leave community'}), 500
@@ -1586,7 +1530,6 @@ def discover_communities():
     """
     conn = None
     try:
-        username = get_jwt_identity()
         search = request.args.get('search', '').strip()
         limit = int(request.args.get('limit', 20))
         offset = int(request.args.get('offset', 0))
@@ -1597,11 +1540,9 @@ def discover_communities():
         conn = get_db_connection()
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
             # Build search query
             search_condition = ""
@@ -1659,9 +1600,7 @@ def discover_communities():
         return jsonify(result), 200
 
     except Exception as e:
-        print(f"[ERROR] discover_communities: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] discover_communities: %s", e)
         return jsonify({'error': 'Failed to discover communities'}), 500
     finally:
         if conn:
@@ -1681,78 +1620,48 @@ def join_community(community_id):
     """
     conn = None
     try:
-        username = get_jwt_identity()
         conn = get_db_connection()
         
         with conn.cursor() as cur:
             # Get user ID
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user_row = cur.fetchone()
-            if not user_row:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user_row['id']
 
-            # Check if community exists
-            cur.execute("SELECT id, name FROM communities WHERE id = %s", (community_id,))
+            # Community, block status and existing membership in one probe
+            cur.execute("""
+                SELECT c.id, c.name,
+                       EXISTS(SELECT 1 FROM blocked_users bu
+                              WHERE bu.community_id = c.id AND bu.user_id = %s) AS is_blocked,
+                       EXISTS(SELECT 1 FROM community_members cm
+                              WHERE cm.community_id = c.id AND cm.user_id = %s) AS is_member
+                FROM communities c
+                WHERE c.id = %s
+            """, (user_id, user_id, community_id))
             community = cur.fetchone()
             if not community:
                 return jsonify({'error': 'Community not found'}), 404
-
-            # Check if user is blocked from this community
-            cur.execute(
-                "SELECT 1 FROM blocked_users WHERE community_id = %s AND user_id = %s",
-                (community_id, user_id)
-            )
-            if cur.fetchone():
+            if community['is_blocked']:
                 return jsonify({'error': 'You are blocked from this community'}), 403
-
-            # Check if already a member
-            cur.execute("""
-                SELECT id FROM community_members 
-                WHERE community_id = %s AND user_id = %s
-            """, (community_id, user_id))
-            existing_member = cur.fetchone()
-            
-            if existing_member:
+            if community['is_member']:
                 return jsonify({'error': 'Already a member of this community'}), 400
 
             # Add user to community as 'member'
-            cur.execute("""
-                INSERT INTO community_members (community_id, user_id, role)
-                VALUES (%s, %s, 'member')
-            """, (community_id, user_id))
+            cur.execute(_ADD_COMMUNITY_MEMBER_SQL, (community_id, user_id))
 
-            # Get all public channels in the community and add user to them
-            cur.execute("""
-                SELECT id FROM channels 
-                WHERE community_id = %s
-            """, (community_id,))
-            channels = cur.fetchall()
-            
-            for channel in channels:
-                channel_id = channel['id']
-                # Check if user is not already in channel
-                cur.execute("""
-                    SELECT id FROM channel_members 
-                    WHERE channel_id = %s AND user_id = %s
-                """, (channel_id, user_id))
-                if not cur.fetchone():
-                    cur.execute("""
-                        INSERT INTO channel_members (channel_id, user_id, role)
-                        VALUES (%s, %s, 'member')
-                    """, (channel_id, user_id))
+            # Add user to every channel in the community (existing rows are skipped)
+            cur.execute(_ADD_TO_ALL_CHANNELS_SQL, (user_id, community_id))
 
         conn.commit()
-        print(f"[SUCCESS] User {user_id} joined community {community_id}")
+        invalidate_community(community_id)
+        log.info("[CHANNELS] User %s joined community %s", user_id, community_id)
         return jsonify({
             'message': f'Successfully joined {community["name"]}',
             'community_id': community_id
         }), 200
 
     except Exception as e:
-        print(f"[ERROR] join_community: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("[CHANNELS] join_community: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to join community'}), 500
@@ -10,6 +10,7 @@ Security: All endpoints require JWT + owner/admin role for the specific communit
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import get_db_connection
+from services.community_cache import invalidate_community
 from datetime import datetime, timedelta
 from functools import wraps
 import logging
@@ -665,6 +666,7 @@ def update_member_role(community_id, user_id):
             """, (new_role, community_id, user_id))
             
         conn.commit()
+        invalidate_community(community_id)
         return jsonify({'success': True, 'message': 'Role updated'}), 200
         
     except Exception as e:
@@ -711,6 +713,7 @@ def remove_member(community_id, user_id):
             """, (community_id, user_id))
             
         conn.commit()
+        invalidate_community(community_id)
         return jsonify({'success': True, 'message': 'Member removed'}), 200
         
     except Exception as e:
@@ -982,6 +985,7 @@ def unblock_user(community_id, user_id):
             """, (community_id, user_id))
         
         conn.commit()
+        invalidate_community(community_id)
         return jsonify({'success': True, 'message': 'User unblocked'}), 200
         
     except Exception as e:
@@ -1050,6 +1054,7 @@ def block_user(community_id):
             """, (community_id, user_id))
         
         conn.commit()
+        invalidate_community(community_id)
         return jsonify({'success': True, 'message': 'User blocked'}), 200
         
     except Exception as e:
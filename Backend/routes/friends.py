@@ -3,7 +3,11 @@
 from flask import jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import get_db_connection
+from utils import get_avatar_url
 from datetime import datetime
+import logging
+
+log = logging.getLogger(__name__)
 
 
 # =====================================
@@ -131,7 +135,7 @@ def send_friend_request():
             # Room-based emit (reaches all sockets in the personal room)
             socketio.emit('friend_request_received', notification_data, 
                          to=receiver_room, namespace='/')
-            print(f"[FRIEND_REQUEST] ✅ Event emitted to room {receiver_room}")
+            log.info("[FRIEND_REQUEST] ✅ Event emitted to room %s", receiver_room)
             
             # Also emit directly to the user's socket ID as fallback
             if receiver_username and receiver_username in user_socket_sessions:
@@ -140,12 +144,12 @@ def send_friend_request():
                              to=receiver_sid, namespace='/')
             
         except Exception as socket_error:
-            print(f"[FRIEND_REQUEST] ❌ Failed to emit event: {socket_error}")
+            log.warning("[FRIEND_REQUEST] ❌ Failed to emit event: %s", socket_error)
         
         return jsonify(response_data), 201
 
     except Exception as e:
-        print(f"[ERROR] send_friend_request: {e}")
+        log.exception("[FRIENDS] send_friend_request: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Internal server error'}), 500
@@ -185,8 +189,7 @@ def get_pending_requests():
             return {
                 'username': username,
                 'display_name': user_row['display_name'] or username,
-                'avatar_url': user_row['avatar_url'] or 
-                             f"https://api.dicebear.com/7.x/avataaars/svg?seed={username}"
+                'avatar_url': get_avatar_url(username, user_row['avatar_url'])
             }
 
         result = [
@@ -195,7 +198,7 @@ def get_pending_requests():
                 'sender_id': r['sender_id'],
                 'username': r['username'],
                 'display_name': r['display_name'] or r['username'],
-                'avatar_url': r['avatar_url'] or f"https://api.dicebear.com/7.x/avataaars/svg?seed={r['username']}",
+                'avatar_url': get_avatar_url(r['username'], r['avatar_url']),
                 'created_at': r['created_at'].isoformat() if r['created_at'] else None
             } for r in requests
         ]
@@ -203,7 +206,7 @@ def get_pending_requests():
         return jsonify(result), 200
 
     except Exception as e:
-        print(f"[ERROR] get_pending_requests: {e}")
+        log.exception("[FRIENDS] get_pending_requests: %s", e)
         return jsonify({'error': 'Failed to fetch requests'}), 500
     finally:
         if conn:
@@ -240,8 +243,7 @@ def get_sent_requests():
             return {
                 'username': username,
                 'display_name': user_row['display_name'] or username,
-                'avatar_url': user_row['avatar_url'] or 
-                             f"https://api.dicebear.com/7.x/avataaars/svg?seed={username}"
+                'avatar_url': get_avatar_url(username, user_row['avatar_url'])
             }
 
         result = [
@@ -250,7 +252,7 @@ def get_sent_requests():
                 'receiver_id': r['receiver_id'],
                 'username': r['username'],
                 'display_name': r['display_name'] or r['username'],
-                'avatar_url': r['avatar_url'] or f"https://api.dicebear.com/7.x/avataaars/svg?seed={r['username']}",
+                'avatar_url': get_avatar_url(r['username'], r['avatar_url']),
                 'created_at': r['created_at'].isoformat() if r['created_at'] else None
             } for r in requests
         ]
@@ -258,7 +260,7 @@ def get_sent_requests():
         return jsonify(result), 200
 
     except Exception as e:
-        print(f"[ERROR] get_sent_requests: {e}")
+        log.exception("[FRIENDS] get_sent_requests: %s", e)
         return jsonify({'error': 'Failed to fetch sent requests'}), 500
     finally:
         if conn:
@@ -336,14 +338,14 @@ def accept_friend_request(request_id):
             socketio.emit('friend_status', {'friend_id': req['sender_id'], 'status': 'accepted'},
                          room=f"user_{user_id}", namespace='/')
             
-            print(f"[SOCKET] Emitted friend_request_accepted to user_{req['sender_id']}")
+            log.info("[SOCKET] Emitted friend_request_accepted to user_%s", req['sender_id'])
         except Exception as socket_error:
-            print(f"[WARNING] Failed to emit friend_request_accepted event: {socket_error}")
+            log.warning("[FRIENDS] Failed to emit friend_request_accepted event: %s", socket_error)
         
         return jsonify({'message': 'Friend request accepted'}), 200
 
     except Exception as e:
-        print(f"[ERROR] accept_friend_request: {e}")
+        log.exception("[FRIENDS] accept_friend_request: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to accept request'}), 500
@@ -388,7 +390,7 @@ def _update_request_status(request_id, status, role_field):
         return jsonify({'message': f'Friend request {status}'}), 200
 
     except Exception as e:
-        print(f"[ERROR] update_request_status ({status}): {e}")
+        log.exception("[FRIENDS] update_request_status (%s): %s", status, e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Operation failed'}), 500
@@ -423,7 +425,7 @@ def remove_friend(friend_id):
         return jsonify({'message': 'Friend removed'}), 200
 
     except Exception as e:
-        print(f"[ERROR] remove_friend: {e}")
+        log.exception("[FRIENDS] remove_friend: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to remove friend'}), 500
@@ -476,7 +478,7 @@ def block_friend(friend_id):
         return jsonify({'message': 'User blocked'}), 200
 
     except Exception as e:
-        print(f"[ERROR] block_friend: {e}")
+        log.exception("[FRIENDS] block_friend: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to block user'}), 500
@@ -514,13 +516,13 @@ def get_blocked_friends():
                 'id': u['id'],
                 'username': u['username'],
                 'display_name': u['display_name'] or u['username'],
-                'avatar_url': u['avatar_url'] or f"https://api.dicebear.com/7.x/avataaars/svg?seed={u['username']}"
+                'avatar_url': get_avatar_url(u['username'], u['avatar_url'])
             } for u in blocked
         ]
         return jsonify(result), 200
 
     except Exception as e:
-        print(f"[ERROR] get_blocked_friends: {e}")
+        log.exception("[FRIENDS] get_blocked_friends: %s", e)
         return jsonify({'error': 'Failed to fetch blocked users'}), 500
     finally:
         if conn:
@@ -556,7 +558,7 @@ def unblock_friend(friend_id):
         return jsonify({'message': 'User unblocked'}), 200
 
     except Exception as e:
-        print(f"[ERROR] unblock_friend: {e}")
+        log.exception("[FRIENDS] unblock_friend: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to unblock user'}), 500
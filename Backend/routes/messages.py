@@ -3,6 +3,8 @@ from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import get_db_connection
 from utils import get_avatar_url
+from services.user_cache import jwt_user_id
+from services.community_cache import invalidate_community
 from datetime import datetime
 import sys
 import os
@@ -22,10 +24,10 @@ moderation_agent = ModerationAgent()
 def handle_ai_command(content: str, username: str, user_id: int, channel_id: int, community_id: int = None):
     """Handle AI commands from chat (/summarize, /help, etc.)"""
     try:
-        log.info(f"[HTTP COMMAND] Processing command: {content}")
+        log.debug("[HTTP COMMAND] Processing command: %s", content)
         command_parts = content.strip().split()
         command = command_parts[0].lower()
-        log.info(f"[HTTP COMMAND] Parsed command: {command}")
+        log.debug("[HTTP COMMAND] Parsed command: %s", command)
         
         if command == '/summarize':
             # Parse optional message count
@@ -33,7 +35,7 @@ def handle_ai_command(content: str, username: str, user_id: int, channel_id: int
             if len(command_parts) > 1 and command_parts[1].isdigit():
                 message_count = min(int(command_parts[1]), 200)
             
-            log.info(f"[HTTP COMMAND] /summarize requested by {username} for channel {channel_id} with {message_count} messages")
+            log.debug("[HTTP COMMAND] /summarize requested by %s for channel %s with %s messages", username, channel_id, message_count)
             
             # Generate summary
             summarizer = SummarizerAgent()
@@ -43,7 +45,7 @@ def handle_ai_command(content: str, username: str, user_id: int, channel_id: int
                 user_id=user_id
             )
             
-            log.info(f"[HTTP COMMAND] Summarizer returned: {result}")
+            log.debug("[HTTP COMMAND] Summarizer returned: %s", result)
             
             if result.get('success'):
                 return {
@@ -78,7 +80,7 @@ More commands coming soon!"""
             return None
             
     except Exception as e:
-        log.error(f"[HTTP COMMAND] Error: {e}", exc_info=True)
+        log.exception("[HTTP COMMAND] Error: %s", e)
         return {
             'type': 'error',
             'success': False,
@@ -101,14 +103,11 @@ def get_channel_messages(channel_id):
         limit = min(request.args.get('limit', 50, type=int), 100)
         offset = max(request.args.get('offset', 0, type=int), 0)
 
-        current_user = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            user = cur.fetchone()
-            if not user:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user['id']
 
             # Check channel access
             cur.execute("SELECT 1 FROM channel_members WHERE channel_id = %s AND user_id = %s",
@@ -172,7 +171,7 @@ def get_channel_messages(channel_id):
         return jsonify(result), 200
 
     except Exception as e:
-        print(f"[ERROR] get_channel_messages: {e}")
+        log.exception("[MESSAGES] get_channel_messages: %s", e)
         return jsonify({'error': 'Failed to fetch messages'}), 500
     finally:
         if conn:
@@ -216,23 +215,21 @@ def send_message():
         if not channel_id or not content:
             return jsonify({'error': 'channel_id and content required'}), 400
 
-        log.info(f"[HTTP SEND] User {current_user} sending message to channel {channel_id}: {content[:50]}...")
+        log.debug("[HTTP SEND] User %s sending message to channel %s: %s...", current_user, channel_id, content[:50])
 
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            user = cur.fetchone()
-            if not user:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user['id']
-            log.info(f"[HTTP SEND] User ID: {user_id}")
+            log.debug("[HTTP SEND] User ID: %s", user_id)
 
             cur.execute("SELECT id, community_id FROM channels WHERE id = %s", (channel_id,))
             channel_row = cur.fetchone()
             if not channel_row:
                 return jsonify({'error': 'Channel not found'}), 404
             community_id = channel_row['community_id']
-            log.info(f"[HTTP SEND] Channel {channel_id} in community {community_id}")
+            log.debug("[HTTP SEND] Channel %s in community %s", channel_id, community_id)
 
             cur.execute("SELECT 1 FROM channel_members WHERE channel_id = %s AND user_id = %s",
                         (channel_id, user_id))
@@ -266,44 +263,44 @@ def send_message():
 
             # 🤖 AI COMMAND DETECTION - Check before any processing
             if content.strip().startswith('/'):
-                log.info(f"[HTTP] ✅ COMMAND DETECTED: {content}")
+                log.debug("[HTTP] ✅ COMMAND DETECTED: %s", content)
                 try:
                     command_result = handle_ai_command(content, current_user, user_id, channel_id, community_id)
-                    log.info(f"[HTTP] ✅ Command handler returned: {command_result}")
+                    log.debug("[HTTP] ✅ Command handler returned: %s", command_result)
                     
                     if command_result:
                         # Emit command result via socket to ALL users in the channel
                         from flask import current_app
                         socketio = current_app.extensions.get('socketio')
                         if socketio:
-                            log.info(f"[HTTP] ✅ SocketIO found, emitting to channel_{channel_id} and community_{community_id}")
+                            log.debug("[HTTP] ✅ SocketIO found, emitting to channel_%s and community_%s", channel_id, community_id)
                             
                             # Get all rooms and connected sockets for debugging
                             try:
                                 from routes.sockets import user_socket_sessions
                                 user_sid = user_socket_sessions.get(current_user)
-                                log.info(f"[HTTP] 🔍 User '{current_user}' socket SID: {user_sid}")
+                                log.debug("[HTTP] 🔍 User '%s' socket SID: %s", current_user, user_sid)
                                 
                                 # Get socket's current rooms
                                 if user_sid:
                                     from flask_socketio import rooms as get_rooms
                                     user_rooms = get_rooms(sid=user_sid, namespace='/')
-                                    log.info(f"[HTTP] 🔍 Socket {user_sid} is in rooms: {user_rooms}")
+                                    log.debug("[HTTP] 🔍 Socket %s is in rooms: %s", user_sid, user_rooms)
                                     
                                     # Direct emission to user's socket as BACKUP
                                     socketio.emit('command_result', command_result, room=user_sid, namespace='/')
-                                    log.info(f"[HTTP] ✅ DIRECT EMIT to user socket {user_sid}")
+                                    log.debug("[HTTP] ✅ DIRECT EMIT to user socket %s", user_sid)
                             except Exception as room_err:
-                                log.warning(f"[HTTP] ⚠️  Room check failed: {room_err}")
+                                log.warning("[HTTP] ⚠️  Room check failed: %s", room_err)
                             
                             # Emit to both rooms (standard broadcast)
                             socketio.emit('command_result', command_result, room=f"channel_{channel_id}", namespace='/')
-                            log.info(f"[HTTP] ✅ ROOM EMIT to channel_{channel_id}")
+                            log.debug("[HTTP] ✅ ROOM EMIT to channel_%s", channel_id)
                             
                             socketio.emit('command_result', command_result, room=f"community_{community_id}", namespace='/')
-                            log.info(f"[HTTP] ✅ ROOM EMIT to community_{community_id}")
+                            log.debug("[HTTP] ✅ ROOM EMIT to community_%s", community_id)
                         else:
-                            log.error(f"[HTTP] ❌ SocketIO not found in app extensions!")
+                            log.error("[HTTP] ❌ SocketIO not found in app extensions!")
                         
                         # Still save and broadcast the command message for transparency
                         cur.execute("""
@@ -312,7 +309,7 @@ def send_message():
                         """, (channel_id, user_id, content, 'text', reply_to or None))
                         message_id = cur.lastrowid
                         conn.commit()
-                        log.info(f"[HTTP] ✅ Command message saved with ID {message_id}")
+                        log.debug("[HTTP] ✅ Command message saved with ID %s", message_id)
                         
                         # Broadcast the command message itself too
                         if socketio:
@@ -328,10 +325,10 @@ def send_message():
                             }
                             socketio.emit('message_received', msg_payload, room=f"channel_{channel_id}", namespace='/')
                             socketio.emit('message_received', msg_payload, room=f"community_{community_id}", namespace='/')
-                            log.info(f"[HTTP] ✅ Command message broadcasted")
+                            log.debug("[HTTP] ✅ Command message broadcasted")
                         
                         # Return command result + message info
-                        log.info(f"[HTTP] ✅ Returning success response with command_result")
+                        log.debug("[HTTP] ✅ Returning success response with command_result")
                         return jsonify({
                             'message': {
                                 'id': message_id,
@@ -345,9 +342,9 @@ def send_message():
                             'command_result': command_result
                         }), 201
                     else:
-                        log.info(f"[HTTP] ⚠️  Command handler returned None, treating as regular message")
+                        log.debug("[HTTP] ⚠️  Command handler returned None, treating as regular message")
                 except Exception as cmd_error:
-                    log.error(f"[HTTP] ❌ Command error: {cmd_error}", exc_info=True)
+                    log.exception("[HTTP] ❌ Command error: %s", cmd_error)
                     return jsonify({
                         'error': f'Command failed: {str(cmd_error)}',
                         'command_result': {
@@ -556,7 +553,7 @@ def send_message():
                     "INSERT IGNORE INTO blocked_users (community_id, user_id) VALUES (%s, %s)",
                     (community_id, user_id)
                 )
-                print(f"[DEBUG] Inserted into blocked_users: community_id={community_id}, user_id={user_id}")
+                log.debug("[MESSAGES] Inserted into blocked_users: community_id=%s, user_id=%s", community_id, user_id)
                 
                 cur.execute(
                     "DELETE FROM channel_members WHERE user_id = %s AND channel_id IN (SELECT id FROM channels WHERE community_id = %s)",
@@ -567,7 +564,8 @@ def send_message():
                     (community_id, user_id)
                 )
                 conn.commit()
-                print(f"[DEBUG] Committed: User {user_id} removed from community {community_id}")
+                invalidate_community(community_id)
+                log.debug("[MESSAGES] Committed: User %s removed from community %s", user_id, community_id)
                 
                 # Verify the insert worked
                 cur.execute("""
@@ -576,9 +574,9 @@ def send_message():
                 """, (community_id, user_id))
                 blocked_record = cur.fetchone()
                 if blocked_record:
-                    print(f"[DEBUG] ✓ Verified blocked_users record exists: {blocked_record}")
+                    log.debug("[MESSAGES] ✓ Verified blocked_users record exists: %s", blocked_record)
                 else:
-                    print(f"[ERROR] ✗ blocked_users record NOT FOUND after insert!")
+                    log.error("[MESSAGES] ✗ blocked_users record NOT FOUND after insert!")
                 
                 # Emit socket event to disconnect user from community with notification data
                 from flask_socketio import emit
@@ -633,7 +631,7 @@ def send_message():
                 "INSERT IGNORE INTO blocked_users (community_id, user_id) VALUES (%s, %s)",
                 (community_id, user_id)
             )
-            print(f"[DEBUG] Inserted into blocked_users: community_id={community_id}, user_id={user_id}")
+            log.debug("[MESSAGES] Inserted into blocked_users: community_id=%s, user_id=%s", community_id, user_id)
             
             cur.execute(
                 "DELETE FROM channel_members WHERE user_id = %s AND channel_id IN (SELECT id FROM channels WHERE community_id = %s)",
@@ -644,7 +642,8 @@ def send_message():
                 (community_id, user_id)
             )
             conn.commit()
-            print(f"[DEBUG] Committed: User {user_id} blocked from community {community_id}")
+            invalidate_community(community_id)
+            log.debug("[MESSAGES] Committed: User %s blocked from community %s", user_id, community_id)
             
             # Verify the insert worked
             cur.execute("""
@@ -653,9 +652,9 @@ def send_message():
             """, (community_id, user_id))
             blocked_record = cur.fetchone()
             if blocked_record:
-                print(f"[DEBUG] ✓ Verified blocked_users record exists: {blocked_record}")
+                log.debug("[MESSAGES] ✓ Verified blocked_users record exists: %s", blocked_record)
             else:
-                print(f"[ERROR] ✗ blocked_users record NOT FOUND after insert!")
+                log.error("[MESSAGES] ✗ blocked_users record NOT FOUND after insert!")
             
             # Emit socket event to disconnect user from community with notification data
             from flask_socketio import emit
@@ -699,7 +698,7 @@ def send_message():
             }), 403
 
     except Exception as e:
-        print(f"[ERROR] send_message: {e}")
+        log.exception("[MESSAGES] send_message: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to send message'}), 500
@@ -718,14 +717,11 @@ def get_direct_messages(user_id):
         limit = min(request.args.get('limit', 50, type=int), 100)
         offset = max(request.args.get('offset', 0, type=int), 0)
 
-        current_user = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            user = cur.fetchone()
-            if not user:
+            current_user_id = jwt_user_id(cur)
+            if not current_user_id:
                 return jsonify({'error': 'User not found'}), 404
-            current_user_id = user['id']
 
             cur.execute("""
                 SELECT 
@@ -783,7 +779,7 @@ def get_direct_messages(user_id):
         return jsonify(result), 200
 
     except Exception as e:
-        print(f"[ERROR] get_direct_messages: {e}")
+        log.exception("[MESSAGES] get_direct_messages: %s", e)
         return jsonify({'error': 'Failed to fetch DMs'}), 500
     finally:
         if conn:
@@ -797,7 +793,6 @@ def get_direct_messages(user_id):
 def send_direct_message():
     conn = None
     try:
-        current_user = get_jwt_identity()
         data = request.get_json() or {}
         receiver_id = data.get('receiver_id')
         content = data.get('content')
@@ -809,14 +804,16 @@ def send_direct_message():
 
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            sender = cur.fetchone()
-            if not sender:
+            sender_id = jwt_user_id(cur)
+            if not sender_id:
                 return jsonify({'error': 'User not found'}), 404
-            sender_id = sender['id']
 
-            cur.execute("SELECT 1 FROM users WHERE id = %s", (receiver_id,))
-            if not cur.fetchone():
+            # Existence check doubles as the receiver info for the response
+            cur.execute("""
+                SELECT id, username, display_name, avatar_url FROM users WHERE id = %s
+            """, (receiver_id,))
+            receiver_row = cur.fetchone()
+            if not receiver_row:
                 return jsonify({'error': 'Receiver not found'}), 404
 
             cur.execute("""
@@ -833,21 +830,9 @@ def send_direct_message():
             """, (message_id,))
             msg = cur.fetchone()
 
-        conn.commit()
-        avatar_url = get_avatar_url(msg['username'], msg['avatar_url'])
-        
-        # Get receiver info too
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT id, username, display_name, avatar_url FROM users WHERE id = %s
-            """, (receiver_id,))
-            receiver_row = cur.fetchone()
-            receiver_avatar = get_avatar_url(receiver_row['username'], receiver_row['avatar_url']) if receiver_row else None
-        
-        # Build reply_to_preview if replying to a message
-        reply_to_preview = None
-        if reply_to:
-            with conn.cursor() as cur:
+            # Build reply_to_preview if replying to a message
+            reply_to_preview = None
+            if reply_to:
                 cur.execute("""
                     SELECT dm.content, dm.message_type, u.username
                     FROM direct_messages dm
@@ -863,6 +848,10 @@ def send_direct_message():
                         'message_type': parent['message_type'],
                     }
 
+        conn.commit()
+        avatar_url = get_avatar_url(msg['username'], msg['avatar_url'])
+        receiver_avatar = get_avatar_url(receiver_row['username'], receiver_row['avatar_url'])
+
         return jsonify({
             'id': msg['id'],
             'sender_id': msg['sender_id'],
@@ -889,7 +878,7 @@ def send_direct_message():
         }), 201
 
     except Exception as e:
-        print(f"[ERROR] send_direct_message: {e}")
+        log.exception("[MESSAGES] send_direct_message: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to send DM'}), 500
@@ -905,7 +894,6 @@ def send_direct_message():
 def mark_as_read():
     conn = None
     try:
-        current_user = get_jwt_identity()
         data = request.get_json() or {}
         message_ids = data.get('message_ids', [])
 
@@ -914,11 +902,9 @@ def mark_as_read():
 
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            user = cur.fetchone()
-            if not user:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user['id']
 
             placeholders = ','.join(['%s'] * len(message_ids))
             query = f"""
@@ -936,7 +922,7 @@ def mark_as_read():
         }), 200
 
     except Exception as e:
-        print(f"[ERROR] mark_as_read: {e}")
+        log.exception("[MESSAGES] mark_as_read: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to mark as read'}), 500
@@ -952,14 +938,11 @@ def mark_as_read():
 def delete_message(message_id):
     conn = None
     try:
-        current_user = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            user = cur.fetchone()
-            if not user:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user['id']
 
             cur.execute("SELECT sender_id FROM messages WHERE id = %s", (message_id,))
             msg = cur.fetchone()
@@ -974,7 +957,7 @@ def delete_message(message_id):
         return jsonify({'message': 'Message deleted'}), 200
 
     except Exception as e:
-        print(f"[ERROR] delete_message: {e}")
+        log.exception("[MESSAGES] delete_message: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to delete message'}), 500
@@ -990,7 +973,6 @@ def delete_message(message_id):
 def edit_message(message_id):
     conn = None
     try:
-        current_user = get_jwt_identity()
         data = request.get_json() or {}
         new_content = data.get('content')
         if not new_content:
@@ -998,11 +980,9 @@ def edit_message(message_id):
 
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (current_user,))
-            user = cur.fetchone()
-            if not user:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user['id']
 
             cur.execute("SELECT sender_id FROM messages WHERE id = %s", (message_id,))
             msg = cur.fetchone()
@@ -1036,7 +1016,7 @@ def edit_message(message_id):
         }), 200
 
     except Exception as e:
-        print(f"[ERROR] edit_message: {e}")
+        log.exception("[MESSAGES] edit_message: %s", e)
         if conn:
             conn.rollback()
         return jsonify({'error': 'Failed to edit message'}), 500
@@ -3,6 +3,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import get_db_connection
 from utils import get_avatar_url
+from services.user_cache import jwt_user_id
 import logging
 
 log = logging.getLogger(__name__)
@@ -16,18 +17,16 @@ def get_pinned_messages(channel_id):
     """Get all pinned messages for a channel, newest pin first."""
     conn = None
     try:
-        username = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user = cur.fetchone()
-            if not user:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
 
             # Verify channel access
             cur.execute(
                 "SELECT 1 FROM channel_members WHERE channel_id = %s AND user_id = %s",
-                (channel_id, user['id'])
+                (channel_id, user_id)
             )
             if not cur.fetchone():
                 return jsonify({'error': 'Access denied'}), 403
@@ -111,11 +110,9 @@ def pin_message():
         username = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user = cur.fetchone()
-            if not user:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user['id']
 
             # Verify user is a member of the channel's community
             cur.execute("""
@@ -186,14 +183,11 @@ def unpin_message():
         if not message_id or not channel_id:
             return jsonify({'error': 'message_id and channel_id required'}), 400
 
-        username = get_jwt_identity()
         conn = get_db_connection()
         with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-            user = cur.fetchone()
-            if not user:
+            user_id = jwt_user_id(cur)
+            if not user_id:
                 return jsonify({'error': 'User not found'}), 404
-            user_id = user['id']
 
             # Verify user is a member of the channel's community
             cur.execute("""
@@ -3,6 +3,7 @@ from flask_socketio import emit, join_room, leave_room, rooms, disconnect
 from flask_jwt_extended import decode_token
 from flask import request
 from database import get_db_connection
+from services.user_cache import invalidate_profile
 import logging
 from datetime import datetime
 import sys
@@ -215,6 +216,7 @@ def register_socket_events(socketio):
                     WHERE username = %s
                 """, (username,))
             conn.commit()
+            invalidate_profile(username)
 
             emit('user_status', {
                 'username': username,
@@ -368,6 +370,7 @@ def register_socket_events(socketio):
                     WHERE username = %s
                 """, (username,))
             conn.commit()
+            invalidate_profile(username)
 
             emit('user_status', {
                 'username': username,
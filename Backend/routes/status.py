@@ -3,6 +3,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from database import get_db_connection
 from utils import get_avatar_url
+from services.user_cache import invalidate_profile
 import logging
 
 log = logging.getLogger(__name__)
@@ -54,6 +55,7 @@ def update_my_status():
                 params
             )
             conn.commit()
+            invalidate_profile(username)
 
             # Return updated status
             cur.execute("""
@@ -0,0 +1,129 @@
+# ============================================================================
+# services/community_cache.py — In-process community read cache
+#
+# Short-TTL, thread-safe caches for the community GETs that run on every
+# navigation:
+#   - member lists   (get_community_members), keyed by community_id
+#   - details        (get_community, without the viewer's role), by community_id
+#   - community list (get_communities, unpaged), keyed by user_id
+#
+# Architecture:
+#   Read path:   handler → cache hit / miss → DB → set_*()
+#   Write path:  any write to a community, its channels, members or blocks
+#                → invalidate_community(community_id)
+#
+# Member entries hold the owner's view (violation_count included); callers
+# mask it for everyone else. Viewer lists can't be targeted by community, so
+# any community write drops all of them — writes are rare next to reads. The
+# TTL bounds staleness for writers that don't invalidate explicitly (e.g.
+# profile edits shown in the list).
+# ============================================================================
+
+import threading
+import time
+import logging
+
+log = logging.getLogger(__name__)
+
+# ── Cache storage ───────────────────────────────────────────────────────
+# Key: community_id
+# Value: { "data": [...formatted members...], "ts": timestamp }
+_members_cache: dict = {}
+# Key: community_id → { "data": {...community without role...}, "ts": ... }
+_details_cache: dict = {}
+# Key: user_id → { "data": [...communities...], "ts": ... }
+_lists_cache: dict = {}
+_lock = threading.Lock()
+
+MEMBERS_TTL = 30             # seconds
+MEMBERS_MAX_ENTRIES = 2048   # oldest entry is evicted beyond this
+COMMUNITY_TTL = 30           # seconds, details and viewer lists
+COMMUNITY_MAX_ENTRIES = 4096
+
+
+def _get(cache, key, ttl):
+    with _lock:
+        entry = cache.get(key)
+        if entry and (time.time() - entry["ts"]) < ttl:
+            return entry["data"]
+    return None
+
+
+def _set(cache, key, data, max_entries):
+    with _lock:
+        # Re-insert so dict order stays oldest-write first
+        cache.pop(key, None)
+        if len(cache) >= max_entries:
+            del cache[next(iter(cache))]
+        cache[key] = {"data": data, "ts": time.time()}
+
+
+# ── Public API ──────────────────────────────────────────────────────────
+
+def get_members(community_id: int):
+    """Return the cached member list for community_id, or None."""
+    return _get(_members_cache, community_id, MEMBERS_TTL)
+
+
+def set_members(community_id: int, data: list):
+    """Store a formatted member list. Callers must not mutate it afterwards."""
+    _set(_members_cache, community_id, data, MEMBERS_MAX_ENTRIES)
+
+
+def members_for_viewer(members: list, viewer_role):
+    """Member list as seen by viewer_role — only owners see violation counts."""
+    if viewer_role == 'owner':
+        return members
+    return [{**m, 'violation_count': None} for m in members]
+
+
+def get_details(community_id: int):
+    """Return cached community details (no viewer role), or None."""
+    return _get(_details_cache, community_id, COMMUNITY_TTL)
+
+
+def set_details(community_id: int, data: dict):
+    """Store viewer-independent community details. Do not mutate afterwards."""
+    _set(_details_cache, community_id, data, COMMUNITY_MAX_ENTRIES)
+
+
+def get_user_communities(user_id: int):
+    """Return the cached community list for user_id, or None."""
+    return _get(_lists_cache, user_id, COMMUNITY_TTL)
+
+
+def set_user_communities(user_id: int, data: list):
+    """Store a user's formatted community list. Do not mutate afterwards."""
+    _set(_lists_cache, user_id, data, COMMUNITY_MAX_ENTRIES)
+
+
+def invalidate_community(community_id):
+    """Drop everything cached for community_id, plus every viewer list."""
+    with _lock:
+        # Route params may arrive as str (JSON bodies) — drop both spellings
+        keys = {community_id}
+        try:
+            keys.add(int(community_id))
+        except (TypeError, ValueError):
+            pass
+        for key in keys:
+            _members_cache.pop(key, None)
+            _details_cache.pop(key, None)
+        _lists_cache.clear()
+
+
+# ── Periodic cache cleanup (evict stale entries) ───────────────────────
+def cleanup_cache():
+    """Remove expired entries. Call from a background thread."""
+    now = time.time()
+    evicted = 0
+    with _lock:
+        for cache, ttl in ((_members_cache, MEMBERS_TTL),
+                           (_details_cache, COMMUNITY_TTL),
+                           (_lists_cache, COMMUNITY_TTL)):
+            stale = [k for k, v in cache.items() if (now - v["ts"]) > ttl]
+            for k in stale:
+                del cache[k]
+            evicted += len(stale)
+    if evicted:
+        log.debug("[COMMUNITY_CACHE] Evicted %d stale entries", evicted)
@@ -1,9 +1,12 @@
 # services/email_service.py
+import logging
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from config import SMTP_EMAIL, SMTP_SERVER, SMTP_PORT, SMTP_APP_PASSWORD
 
+log = logging.getLogger(__name__)
+
 def send_otp_email(to_email: str, otp: str):
     subject = "AuraFlow Password Reset OTP"
     body = f"Your AuraFlow password reset code is: {otp}\nThis code is valid for 5 minutes."
@@ -12,9 +15,9 @@ def send_otp_email(to_email: str, otp: str):
     msg["From"] = SMTP_EMAIL or "no-reply@auraflow.local"
     msg["To"] = to_email
 
-    # DEVELOPMENT fallback — prints OTP to console when SMTP not configured
+    # DEVELOPMENT fallback — logs OTP to console when SMTP not configured
     if not SMTP_EMAIL or not SMTP_APP_PASSWORD:
-        print(f"[DEV] OTP for {to_email}: {otp}")
+        log.info("[DEV] OTP for %s: %s", to_email, otp)
         return
 
     with smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT) as server:
@@ -74,10 +77,10 @@ def send_verification_email(to_email: str, verification_token: str, frontend_url
 
     # DEVELOPMENT fallback
     if not SMTP_EMAIL or not SMTP_APP_PASSWORD:
-        print(f"[DEV] Verification link for {to_email}: {verify_link}")
+        log.info("[DEV] Verification link for %s: %s", to_email, verify_link)
         return
 
     with smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT) as server:
         server.login(SMTP_EMAIL, SMTP_APP_PASSWORD)
         server.sendmail(SMTP_EMAIL, [to_email], msg.as_string())
-    print(f"[EMAIL] Verification email sent to {to_email}")
+    log.info("[EMAIL] Verification email sent to %s", to_email)
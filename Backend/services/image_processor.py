@@ -0,0 +1,90 @@
+"""
+services/image_processor.py - community logo/banner resizing
+
+Pillow decode + LANCZOS resize + JPEG encode is CPU-bound (tens to hundreds
+of ms for a multi-megapixel upload). Run inline it occupies the request worker
+for that long; with IMAGE_POOL_WORKERS > 0 the work is shipped to a
+ProcessPoolExecutor instead, so the worker only waits on a future and
+concurrent resizes are capped at the pool size.
+
+IMAGE_POOL_WORKERS = 0 (default) keeps processing inline in the caller;
+IMAGE_POOL_WORKERS = -1 sizes the pool to os.cpu_count(). As with bcrypt,
+an inline resize under the gevent worker stalls every greenlet in the process.
+"""
+
+import atexit
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from config import IMAGE_POOL_WORKERS
+
+log = logging.getLogger(__name__)
+
+_POOL_SIZE = IMAGE_POOL_WORKERS if IMAGE_POOL_WORKERS >= 0 else (os.cpu_count() or 1)
+
+_pool = None
+_pool_lock = Lock()
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Worker function (module-level so it can be pickled to the pool)
+# ─────────────────────────────────────────────────────────────────────
+def _render(data: bytes, max_size: Tuple[int, int], maintain_aspect: bool) -> bytes:
+    img = Image.open(io.BytesIO(data))
+    if img.format == 'JPEG':
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale (never below max_size)
+        # instead of decoding full resolution only to throw most of it away
+        img.draft('RGB', max_size)
+
+    # Convert to RGB if necessary (for PNG with transparency)
+    if img.mode in ('RGBA', 'P'):
+        img = img.convert('RGB')
+
+    if maintain_aspect:
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+    else:
+        img = img.resize(max_size, Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    # Progressive + optimized Huffman tables: smaller files, and banners paint
+    # coarse-to-fine. EXIF/ICC aren't carried over unless passed explicitly.
+    img.save(output, format='JPEG', quality=85, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def _get_pool():
+    """Create the process pool on first use (after any fork/monkey-patching)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=_POOL_SIZE)
+                atexit.register(_pool.shutdown, wait=False)
+                log.info("[IMAGES] Started image pool with %d workers", _POOL_SIZE)
+    return _pool
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────
+def process_image(file, max_size, maintain_aspect=True) -> Optional[io.BytesIO]:
+    """
+    Resize an uploaded image and re-encode it as JPEG.
+    Returns a BytesIO positioned at 0, or None if the image can't be processed.
+    """
+    try:
+        data = file.read()
+        if _POOL_SIZE > 0:
+            rendered = _get_pool().submit(_render, data, tuple(max_size), maintain_aspect).result()
+        else:
+            rendered = _render(data, tuple(max_size), maintain_aspect)
+        return io.BytesIO(rendered)
+    except Exception as e:
+        log.exception("[IMAGES] process_image: %s", e)
+        return None
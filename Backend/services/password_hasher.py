@@ -0,0 +1,97 @@
+"""
+services/password_hasher.py - bcrypt hashing for AuraFlow auth routes
+
+bcrypt is deliberately slow (~50-300 ms per call at cost 10-12).  Run inline it
+occupies the request worker for that long; with BCRYPT_POOL_WORKERS > 0 the
+work is shipped to a ProcessPoolExecutor instead, so the worker only waits on
+a future and concurrent hashing is capped at the pool size.
+
+BCRYPT_POOL_WORKERS = 0 (default) keeps hashing inline in the caller;
+BCRYPT_POOL_WORKERS = -1 sizes the pool to os.cpu_count(). Under the gevent
+worker an inline hash stalls every greenlet in the process, so production
+deployments should enable the pool.
+
+Passwords and hashes may be passed as str or as already-encoded UTF-8 bytes;
+callers that use one password for several calls (login) encode it once.
+"""
+
+import atexit
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Union
+
+import bcrypt
+
+from config import BCRYPT_ROUNDS, BCRYPT_POOL_WORKERS
+
+log = logging.getLogger(__name__)
+
+_POOL_SIZE = BCRYPT_POOL_WORKERS if BCRYPT_POOL_WORKERS >= 0 else (os.cpu_count() or 1)
+
+_pool = None
+_pool_lock = Lock()
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Worker functions (module-level so they can be pickled to the pool)
+# ─────────────────────────────────────────────────────────────────────
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _check(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+def _get_pool():
+    """Create the process pool on first use (after any fork/monkey-patching)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=_POOL_SIZE)
+                atexit.register(_pool.shutdown, wait=False)
+                log.info("[BCRYPT] Started hashing pool with %d workers", _POOL_SIZE)
+    return _pool
+
+
+def _as_bytes(value: Union[str, bytes]) -> bytes:
+    return value if isinstance(value, bytes) else value.encode('utf-8')
+
+
+def _run(fn, *args):
+    if _POOL_SIZE > 0:
+        return _get_pool().submit(fn, *args).result()
+    return fn(*args)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────
+def hash_password(password: Union[str, bytes]) -> str:
+    """Hash a plaintext password at the configured BCRYPT_ROUNDS cost."""
+    return _run(_hash, _as_bytes(password), BCRYPT_ROUNDS).decode('utf-8')
+
+
+def check_password(password: Union[str, bytes], hashed: Union[str, bytes]) -> bool:
+    """Constant-time compare of a plaintext password against a stored hash."""
+    return _run(_check, _as_bytes(password), _as_bytes(hashed))
+
+
+# Hash of a throwaway secret at the configured cost (kept as bytes); compared
+# against on the unknown-user path so login timing doesn't reveal which
+# accounts exist.
+_DUMMY_HASH = bcrypt.hashpw(b'auraflow-dummy-password', bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+
+def check_dummy(password: Union[str, bytes]) -> bool:
+    """Spend the same bcrypt work as a real check; always returns False."""
+    check_password(password, _DUMMY_HASH)
+    return False
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True if the stored hash ("$2b$NN$...") uses a lower cost than configured."""
+    return int(hashed[4:6]) < BCRYPT_ROUNDS
@@ -19,6 +19,7 @@ Design notes:
 
 import uuid
 import time
+import calendar
 import logging
 from datetime import datetime, timedelta
 from threading import Lock
@@ -30,21 +31,28 @@ log = logging.getLogger(__name__)
 # ─────────────────────────────────────────────────────────────────────
 # In-Memory Access Token Blocklist Cache
 # ─────────────────────────────────────────────────────────────────────
-_blocklist_cache: dict[str, datetime] = {}   # jti -> expires_at
+# Expiries are kept as Unix seconds so the per-request check is a float
+# compare against time.time() instead of building a datetime.
+_blocklist_cache: dict[str, float] = {}   # jti -> expires_at (unix seconds)
 _blocklist_lock = Lock()
 
 
+def _utc_timestamp(dt: datetime) -> float:
+    """Naive-UTC datetime (as stored in MySQL) → Unix seconds."""
+    return calendar.timegm(dt.utctimetuple())
+
+
 def _cache_blocklist(jti: str, expires_at: datetime):
     """Add a JTI to the in-memory blocklist cache."""
     with _blocklist_lock:
-        _blocklist_cache[jti] = expires_at
+        _blocklist_cache[jti] = _utc_timestamp(expires_at)
 
 
 def _is_in_blocklist_cache(jti: str) -> bool:
     """Check if a JTI is in the in-memory blocklist cache."""
     with _blocklist_lock:
         if jti in _blocklist_cache:
-            if _blocklist_cache[jti] > datetime.utcnow():
+            if _blocklist_cache[jti] > time.time():
                 return True
             else:
                 del _blocklist_cache[jti]
@@ -53,13 +61,13 @@ def _is_in_blocklist_cache(jti: str) -> bool:
 
 def cleanup_blocklist_cache():
     """Remove expired entries from the in-memory cache."""
-    now = datetime.utcnow()
+    now = time.time()
     with _blocklist_lock:
         expired = [jti for jti, exp in _blocklist_cache.items() if exp <= now]
         for jti in expired:
             del _blocklist_cache[jti]
     if expired:
-        log.debug(f"[SESSION] Cleaned {len(expired)} expired entries from blocklist cache")
+        log.debug("[SESSION] Cleaned %d expired entries from blocklist cache", len(expired))
 
 
 def load_blocklist_from_db():
@@ -71,10 +79,10 @@ def load_blocklist_from_db():
             rows = cur.fetchall()
             with _blocklist_lock:
                 for row in rows:
-                    _blocklist_cache[row['jti']] = row['expires_at']
-            log.info(f"[SESSION] Loaded {len(rows)} blocked tokens into cache")
+                    _blocklist_cache[row['jti']] = _utc_timestamp(row['expires_at'])
+            log.info("[SESSION] Loaded %d blocked tokens into cache", len(rows))
     except Exception as e:
-        log.warning(f"[SESSION] Could not load blocklist (table may not exist yet): {e}")
+        log.warning("[SESSION] Could not load blocklist (table may not exist yet): %s", e)
     finally:
         conn.close()
 
@@ -87,7 +95,9 @@ def is_token_revoked(jwt_header: dict, jwt_payload: dict) -> bool:
     Determine whether a JWT should be considered revoked.
 
     Access tokens  → in-memory cache ONLY (fast, no DB hit per request).
-    Refresh tokens → DB lookup (only called on /api/token/refresh, acceptable).
+    Refresh tokens → not checked here. The only refresh endpoint validates the
+                     jti against refresh_tokens in rotate_refresh_token(), which
+                     must see revoked tokens to run family-wide reuse detection.
     """
     jti = jwt_payload.get('jti')
     token_type = jwt_payload.get('type', 'access')
@@ -98,21 +108,6 @@ def is_token_revoked(jwt_header: dict, jwt_payload: dict) -> bool:
     if token_type == 'access':
         return _is_in_blocklist_cache(jti)
 
-    if token_type == 'refresh':
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT revoked_at FROM refresh_tokens WHERE jti = %s LIMIT 1",
-                    (jti,)
-                )
-                row = cur.fetchone()
-                if not row:
-                    return True          # Token not in DB → treat as revoked
-                return row['revoked_at'] is not None
-        finally:
-            conn.close()
-
     return False
 
 
@@ -138,8 +133,8 @@ def create_session(user_id: int, username: str, refresh_jti: str,
             """, (refresh_jti, user_id, token_family,
                   device_info, ip_address, refresh_expires))
         conn.commit()
-        log.info(f"[SESSION] Created session for {username} "
-                 f"(family: {token_family[:8]}…, device: {(device_info or '')[:40]})")
+        log.info("[SESSION] Created session for %s (family: %s…, device: %s)",
+                 username, token_family[:8], (device_info or '')[:40])
     finally:
         conn.close()
 
@@ -174,8 +169,8 @@ def rotate_refresh_token(old_jti: str, new_jti: str,
                 return {"success": False, "reason": "not_found"}
 
             if old_token['user_id'] != user_id:
-                log.warning(f"[SESSION] Token user mismatch: "
-                            f"token={old_token['user_id']} request={user_id}")
+                log.warning("[SESSION] Token user mismatch: token=%s request=%s",
+                            old_token['user_id'], user_id)
                 return {"success": False, "reason": "user_mismatch"}
 
             token_family = old_token['token_family']
@@ -185,8 +180,8 @@ def rotate_refresh_token(old_jti: str, new_jti: str,
             # Revoke the ENTIRE family to cut off both attacker and legitimate user
             # (forces re-login — safe default).
             if old_token['revoked_at'] is not None:
-                log.warning(f"[SESSION] 🚨 REFRESH TOKEN REUSE DETECTED! "
-                            f"Family: {token_family}")
+                log.warning("[SESSION] 🚨 REFRESH TOKEN REUSE DETECTED! Family: %s",
+                            token_family)
                 cur.execute("""
                     UPDATE refresh_tokens
                     SET revoked_at = NOW()
@@ -210,7 +205,7 @@ def rotate_refresh_token(old_jti: str, new_jti: str,
             """, (new_jti, new_expires, old_jti))
 
         conn.commit()
-        log.info(f"[SESSION] Rotated refresh token (family: {token_family[:8]}…)")
+        log.info("[SESSION] Rotated refresh token (family: %s…)", token_family[:8])
         return {"success": True, "family": token_family}
     finally:
         conn.close()
@@ -230,7 +225,7 @@ def revoke_session(refresh_jti: str, user_id: int):
                 WHERE jti = %s AND user_id = %s AND revoked_at IS NULL
             """, (refresh_jti, user_id))
         conn.commit()
-        log.info(f"[SESSION] Revoked session {refresh_jti[:8]}… for user {user_id}")
+        log.info("[SESSION] Revoked session %s… for user %s", refresh_jti[:8], user_id)
     finally:
         conn.close()
 
@@ -247,7 +242,7 @@ def revoke_all_sessions(user_id: int) -> int:
             """, (user_id,))
             revoked_count = cur.rowcount
         conn.commit()
-        log.info(f"[SESSION] Revoked {revoked_count} sessions for user {user_id}")
+        log.info("[SESSION] Revoked %d sessions for user %s", revoked_count, user_id)
         return revoked_count
     finally:
         conn.close()
@@ -258,6 +253,20 @@ def blocklist_access_token(jti: str, user_id: int, expires_at: datetime):
     Blocklist an access token for early revocation (e.g., on logout).
     Persists to DB and adds to in-memory cache.
     """
+    mark_access_token_revoked(jti, expires_at)
+    persist_blocklisted_token(jti, user_id, expires_at)
+
+
+def mark_access_token_revoked(jti: str, expires_at: datetime):
+    """
+    Reject an access token from now on (in-memory cache only).
+    Pair with persist_blocklisted_token() so the entry survives restarts.
+    """
+    _cache_blocklist(jti, expires_at)
+
+
+def persist_blocklisted_token(jti: str, user_id: int, expires_at: datetime):
+    """Write a blocklist entry to DB (reloaded into the cache on startup)."""
     conn = get_db_connection()
     try:
         with conn.cursor() as cur:
@@ -266,8 +275,7 @@ def blocklist_access_token(jti: str, user_id: int, expires_at: datetime):
                 VALUES (%s, %s, %s)
             """, (jti, user_id, expires_at))
         conn.commit()
-        _cache_blocklist(jti, expires_at)
-        log.info(f"[SESSION] Blocklisted access token {jti[:8]}… for user {user_id}")
+        log.info("[SESSION] Blocklisted access token %s… for user %s", jti[:8], user_id)
     finally:
         conn.close()
 
@@ -315,7 +323,7 @@ def revoke_session_by_id(session_id: int, user_id: int) -> bool:
             success = cur.rowcount > 0
         conn.commit()
         if success:
-            log.info(f"[SESSION] Revoked session #{session_id} for user {user_id}")
+            log.info("[SESSION] Revoked session #%s for user %s", session_id, user_id)
         return success
     finally:
         conn.close()
@@ -369,9 +377,9 @@ def cleanup_expired_tokens():
         cleanup_blocklist_cache()
 
         if refresh_cleaned or blocklist_cleaned:
-            log.info(f"[SESSION] Cleanup: {refresh_cleaned} expired refresh tokens, "
-                     f"{blocklist_cleaned} expired blocklist entries removed")
+            log.info("[SESSION] Cleanup: %s expired refresh tokens, %s expired blocklist entries removed",
+                     refresh_cleaned, blocklist_cleaned)
     except Exception as e:
-        log.warning(f"[SESSION] Cleanup error: {e}")
+        log.warning("[SESSION] Cleanup error: %s", e)
     finally:
         conn.close()
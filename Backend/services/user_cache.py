@@ -0,0 +1,119 @@
+# ============================================================================
+# services/user_cache.py — In-process user profile cache
+#
+# Short-TTL, thread-safe cache for the /api/me payload so that front-end page
+# loads don't cost a pool checkout + user/role queries every time.
+#
+# Architecture:
+#   Read path:   get_me()  → cache hit (fast) / cache miss → DB → set_profile()
+#   Write path:  any write to users.* shown by /api/me, or to community
+#                ownership → invalidate_profile(username)
+#
+# The TTL bounds staleness for writers that don't invalidate explicitly.
+#
+# Also holds the username → users.id map used for tokens that predate the
+# 'uid' claim. Usernames are never renamed or reused, so entries only expire
+# to bound memory; unknown usernames are not cached.
+# ============================================================================
+
+import threading
+import time
+import logging
+
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+log = logging.getLogger(__name__)
+
+# ── Cache storage ───────────────────────────────────────────────────────
+# Key: username
+# Value: { "data": {...formatted user...}, "ts": timestamp }
+_profile_cache: dict = {}
+_lock = threading.Lock()
+
+PROFILE_TTL = 30             # seconds
+PROFILE_MAX_ENTRIES = 10000  # oldest entry is evicted beyond this
+
+# Key: username
+# Value: { "id": users.id, "ts": timestamp }
+_user_id_cache: dict = {}
+
+USER_ID_TTL = 300            # seconds
+USER_ID_MAX_ENTRIES = 8192
+
+
+# ── Public API ──────────────────────────────────────────────────────────
+
+def get_profile(username: str):
+    """Return a copy of the cached profile for username, or None."""
+    with _lock:
+        entry = _profile_cache.get(username)
+        if entry and (time.time() - entry["ts"]) < PROFILE_TTL:
+            return dict(entry["data"])
+    return None
+
+
+def set_profile(username: str, data: dict):
+    """Store a formatted profile for username."""
+    with _lock:
+        # Re-insert so dict order stays oldest-write first
+        _profile_cache.pop(username, None)
+        if len(_profile_cache) >= PROFILE_MAX_ENTRIES:
+            del _profile_cache[next(iter(_profile_cache))]
+        _profile_cache[username] = {"data": dict(data), "ts": time.time()}
+
+
+def invalidate_profile(username: str):
+    """Drop the cached profile so the next read rebuilds from DB."""
+    with _lock:
+        _profile_cache.pop(username, None)
+
+
+def lookup_user_id(cur, username: str):
+    """
+    Resolve username → users.id, served from cache when fresh.
+    On a miss the lookup runs on the caller's cursor. Returns None if the
+    user doesn't exist.
+    """
+    with _lock:
+        entry = _user_id_cache.get(username)
+        if entry and (time.time() - entry["ts"]) < USER_ID_TTL:
+            return entry["id"]
+
+    cur.execute("SELECT id FROM users WHERE username = %s", (username,))
+    row = cur.fetchone()
+    if not row:
+        return None
+
+    with _lock:
+        _user_id_cache.pop(username, None)
+        if len(_user_id_cache) >= USER_ID_MAX_ENTRIES:
+            del _user_id_cache[next(iter(_user_id_cache))]
+        _user_id_cache[username] = {"id": row["id"], "ts": time.time()}
+    return row["id"]
+
+
+def jwt_user_id(cur):
+    """
+    users.id of the authenticated caller. Read from the JWT 'uid' claim
+    (login/refresh set it) with no DB access; tokens issued before the claim
+    existed fall back to lookup_user_id() on the caller's cursor.
+    """
+    uid = get_jwt().get('uid')
+    if uid is not None:
+        return uid
+    return lookup_user_id(cur, get_jwt_identity())
+
+
+# ── Periodic cache cleanup (evict stale entries) ───────────────────────
+def cleanup_cache():
+    """Remove expired entries. Call from a background thread."""
+    now = time.time()
+    with _lock:
+        stale = [k for k, v in _profile_cache.items() if (now - v["ts"]) > PROFILE_TTL]
+        for k in stale:
+            del _profile_cache[k]
+        stale_ids = [k for k, v in _user_id_cache.items() if (now - v["ts"]) > USER_ID_TTL]
+        for k in stale_ids:
+            del _user_id_cache[k]
+    if stale or stale_ids:
+        log.debug("[USER_CACHE] Evicted %d stale profiles, %d user ids", len(stale), len(stale_ids))
@@ -0,0 +1,110 @@
+"""
+Tests for services/community_cache.py (pure Python, no DB needed)
+"""
+import pytest
+
+from services import community_cache as cc
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in (cc._members_cache, cc._details_cache, cc._lists_cache):
+        cache.clear()
+    yield
+    for cache in (cc._members_cache, cc._details_cache, cc._lists_cache):
+        cache.clear()
+
+
+def test_set_and_get_roundtrip():
+    cc.set_members(1, [{'id': 7}])
+    cc.set_details(1, {'id': 1, 'name': 'c'})
+    cc.set_user_communities(7, [{'id': 1}])
+
+    assert cc.get_members(1) == [{'id': 7}]
+    assert cc.get_details(1) == {'id': 1, 'name': 'c'}
+    assert cc.get_user_communities(7) == [{'id': 1}]
+    assert cc.get_members(2) is None
+
+
+def test_invalidate_accepts_str_and_int_ids():
+    cc.set_members(5, [])
+    cc.set_details(5, {})
+    cc.invalidate_community('5')
+    assert cc.get_members(5) is None
+    assert cc.get_details(5) is None
+
+    cc.set_members(6, [])
+    cc.invalidate_community(6)
+    assert cc.get_members(6) is None
+
+    # Non-numeric ids must not raise
+    cc.invalidate_community('abc')
+    cc.invalidate_community(None)
+
+
+def test_invalidate_leaves_other_communities_but_clears_all_lists():
+    cc.set_members(1, [{'id': 1}])
+    cc.set_details(2, {'id': 2})
+    cc.set_user_communities(10, [{'id': 1}])
+    cc.set_user_communities(11, [{'id': 2}])
+
+    cc.invalidate_community(1)
+
+    assert cc.get_members(1) is None
+    assert cc.get_details(2) == {'id': 2}
+    assert cc.get_user_communities(10) is None
+    assert cc.get_user_communities(11) is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cc.time, 'time', lambda: now[0])
+    cc.set_members(1, [])
+    cc.set_details(1, {})
+    cc.set_user_communities(1, [])
+
+    now[0] += min(cc.MEMBERS_TTL, cc.COMMUNITY_TTL) - 1
+    assert cc.get_members(1) == []
+
+    now[0] = 1000.0 + max(cc.MEMBERS_TTL, cc.COMMUNITY_TTL) + 1
+    assert cc.get_members(1) is None
+    assert cc.get_details(1) is None
+    assert cc.get_user_communities(1) is None
+
+
+def test_cleanup_evicts_only_stale_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cc.time, 'time', lambda: now[0])
+    cc.set_members(1, [])
+    cc.set_user_communities(1, [])
+    now[0] += max(cc.MEMBERS_TTL, cc.COMMUNITY_TTL) + 1
+    cc.set_details(2, {})
+
+    cc.cleanup_cache()
+
+    assert 1 not in cc._members_cache
+    assert 1 not in cc._lists_cache
+    assert 2 in cc._details_cache
+
+
+def test_oldest_entry_evicted_at_max_entries(monkeypatch):
+    monkeypatch.setattr(cc, 'MEMBERS_MAX_ENTRIES', 3)
+    for cid in (1, 2, 3):
+        cc.set_members(cid, [cid])
+    # Rewriting 1 makes it the newest, so 2 is now the oldest
+    cc.set_members(1, [1])
+    cc.set_members(4, [4])
+
+    assert cc.get_members(2) is None
+    assert [cc.get_members(cid) for cid in (1, 3, 4)] == [[1], [3], [4]]
+    assert len(cc._members_cache) == 3
+
+
+def test_members_for_viewer_masks_violations_for_non_owners():
+    members = [{'id': 1, 'violation_count': 3}]
+
+    assert cc.members_for_viewer(members, 'owner') is members
+    for role in ('admin', 'member', None):
+        assert cc.members_for_viewer(members, role) == [{'id': 1, 'violation_count': None}]
+    # The cached list itself is never modified
+    assert members == [{'id': 1, 'violation_count': 3}]
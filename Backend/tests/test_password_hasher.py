@@ -0,0 +1,36 @@
+"""
+Tests for services/password_hasher.py cost parsing / rehash decision
+"""
+import pytest
+
+bcrypt = pytest.importorskip('bcrypt')
+
+from services import password_hasher
+
+
+def test_needs_rehash_compares_stored_cost(monkeypatch):
+    hashed = bcrypt.hashpw(b'secret', bcrypt.gensalt(rounds=4)).decode('utf-8')
+
+    monkeypatch.setattr(password_hasher, 'BCRYPT_ROUNDS', 12)
+    assert password_hasher.needs_rehash(hashed)
+
+    monkeypatch.setattr(password_hasher, 'BCRYPT_ROUNDS', 5)
+    assert password_hasher.needs_rehash(hashed)
+
+    monkeypatch.setattr(password_hasher, 'BCRYPT_ROUNDS', 4)
+    assert not password_hasher.needs_rehash(hashed)
+
+
+def test_needs_rehash_parses_two_digit_cost(monkeypatch):
+    monkeypatch.setattr(password_hasher, 'BCRYPT_ROUNDS', 12)
+    assert not password_hasher.needs_rehash('$2b$12$' + 'a' * 53)
+    assert not password_hasher.needs_rehash('$2b$13$' + 'a' * 53)
+    assert password_hasher.needs_rehash('$2b$10$' + 'a' * 53)
+
+
+def test_hash_password_uses_configured_rounds(monkeypatch):
+    monkeypatch.setattr(password_hasher, 'BCRYPT_ROUNDS', 4)
+    hashed = password_hasher.hash_password('secret')
+    assert hashed.startswith('$2b$04$')
+    assert not password_hasher.needs_rehash(hashed)
+    assert password_hasher.check_password('secret', hashed)
@@ -0,0 +1,71 @@
+"""
+Tests for services/user_cache.py (no DB needed; needs flask_jwt_extended)
+"""
+import pytest
+
+pytest.importorskip('flask_jwt_extended')
+
+from services import user_cache as uc
+
+
+class FakeCursor:
+    def __init__(self, row):
+        self.row = row
+        self.queries = 0
+
+    def execute(self, sql, params):
+        self.queries += 1
+
+    def fetchone(self):
+        return self.row
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    uc._profile_cache.clear()
+    uc._user_id_cache.clear()
+    yield
+    uc._profile_cache.clear()
+    uc._user_id_cache.clear()
+
+
+def test_profile_roundtrip_returns_copies():
+    uc.set_profile('alice', {'id': 1})
+    cached = uc.get_profile('alice')
+    cached['id'] = 2
+    assert uc.get_profile('alice') == {'id': 1}
+
+    uc.invalidate_profile('alice')
+    assert uc.get_profile('alice') is None
+
+
+def test_profile_expires_and_cleanup_evicts(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(uc.time, 'time', lambda: now[0])
+    uc.set_profile('alice', {'id': 1})
+    now[0] += uc.PROFILE_TTL + 1
+    assert uc.get_profile('alice') is None
+
+    uc.cleanup_cache()
+    assert 'alice' not in uc._profile_cache
+
+
+def test_profile_oldest_entry_evicted(monkeypatch):
+    monkeypatch.setattr(uc, 'PROFILE_MAX_ENTRIES', 2)
+    uc.set_profile('a', {})
+    uc.set_profile('b', {})
+    uc.set_profile('c', {})
+    assert uc.get_profile('a') is None
+    assert uc.get_profile('c') == {}
+
+
+def test_lookup_user_id_caches_hits_only():
+    cur = FakeCursor({'id': 42})
+    assert uc.lookup_user_id(cur, 'alice') == 42
+    assert uc.lookup_user_id(cur, 'alice') == 42
+    assert cur.queries == 1
+
+    missing = FakeCursor(None)
+    assert uc.lookup_user_id(missing, 'ghost') is None
+    assert uc.lookup_user_id(missing, 'ghost') is None
+    assert missing.queries == 2
@@ -3,6 +3,16 @@ Utils Package
 =============
 Utility functions and helpers
 """
+from functools import lru_cache
+
+DEFAULT_AVATAR_TEMPLATE = 'https://api.dicebear.com/7.x/avataaars/svg?seed=%s'
+
+
+@lru_cache(maxsize=10000)
+def _default_avatar_url(username):
+    """Dicebear fallback avatar for a username (pure, memoized)."""
+    return DEFAULT_AVATAR_TEMPLATE % username
+
 
 def get_avatar_url(username, custom_url=None):
     """
@@ -16,11 +26,11 @@ def get_avatar_url(username, custom_url=None):
         Valid avatar URL string
     """
     # If custom URL exists and is valid, use it
-    if custom_url and custom_url.strip() and custom_url != 'https://api.dicebear.com/7.x/avataaars/svg?seed=%s':
+    if custom_url and not custom_url.isspace() and custom_url != DEFAULT_AVATAR_TEMPLATE:
         return custom_url
     
     # Otherwise generate default avatar based on username
-    return f"https://api.dicebear.com/7.x/avataaars/svg?seed={username}"
+    return _default_avatar_url(username)
 
 
 def format_user_data(user_row):
@@ -0,0 +1,34 @@
+"""
+orjson-backed JSON provider for Flask
+Serializes jsonify()/request.get_json() payloads with orjson (C-level encoder)
+when it is installed; otherwise Flask's default provider stays in place.
+
+Output matches the default provider: keys sorted, non-str keys (e.g. channel
+ids) stringified, and datetime/Decimal handed to Flask's default() hook so
+their wire format doesn't change.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Drop-in replacement for Flask's DefaultJSONProvider using orjson."""
+
+    if ORJSON_AVAILABLE:
+        _options = (
+            orjson.OPT_SORT_KEYS
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._options).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
@@ -2,6 +2,17 @@
 # Additive module: does NOT modify any existing logic.
 import re
 
+# Compiled once at import; inputs are length-capped before matching, and every
+# pattern is anchored with no nested quantifiers, so matching stays linear.
+
+# RFC-5322 simplified pattern — covers 99 %+ of real-world addresses
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}$')
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+_UPPER_RE = re.compile(r'[A-Z]')
+_LOWER_RE = re.compile(r'[a-z]')
+_DIGIT_RE = re.compile(r'\d')
+_SPECIAL_RE = re.compile(r'[!@#$%^&*()\-_=+\[\]{}|;:\'",.<>?/`~\\]')
+
 
 def validate_email(email: str) -> tuple:
     """
@@ -16,9 +27,7 @@ def validate_email(email: str) -> tuple:
     if len(email) > 255:
         return False, "Email must be less than 255 characters"
 
-    # RFC-5322 simplified pattern — covers 99 %+ of real-world addresses
-    email_regex = r'^[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_regex, email):
+    if not _EMAIL_RE.match(email):
         return False, "Please enter a valid email address"
 
     return True, ""
@@ -45,16 +54,16 @@ def validate_password_strength(password: str) -> tuple:
     if len(password) > 128:
         return False, "Password must be less than 128 characters"
 
-    if not re.search(r'[A-Z]', password):
+    if not _UPPER_RE.search(password):
         return False, "Password must contain at least one uppercase letter"
 
-    if not re.search(r'[a-z]', password):
+    if not _LOWER_RE.search(password):
         return False, "Password must contain at least one lowercase letter"
 
-    if not re.search(r'\d', password):
+    if not _DIGIT_RE.search(password):
         return False, "Password must contain at least one digit"
 
-    if not re.search(r'[!@#$%^&*()\-_=+\[\]{}|;:\'",.<>?/`~\\]', password):
+    if not _SPECIAL_RE.search(password):
         return False, "Password must contain at least one special character (!@#$...)"
 
     return True, ""
@@ -76,7 +85,7 @@ def validate_username(username: str) -> tuple:
     if len(username) > 32:
         return False, "Username must be less than 32 characters"
 
-    if not re.match(r'^[a-zA-Z0-9_]+$', username):
+    if not _USERNAME_RE.match(username):
         return False, "Username can only contain letters, numbers, and underscores"
 
     return True, ""